@@ -1,38 +1,213 @@
 """Bot initialization and configuration."""
 
 import asyncio
-from contextlib import asynccontextmanager
-from typing import Optional
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from aiogram import Bot, Dispatcher
+from aiogram import Bot, Dispatcher, Router
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.enums import ParseMode
-from aiogram.types import BotCommand
+from aiogram.methods import SetMyCommands
+from aiogram.types import BotCommand, BotCommandScopeAllPrivateChats, BotCommandScopeDefault
 from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
 from aiohttp import web
+from aiohttp.resolver import AsyncResolver
 
-from .core.config import settings
-from .core.logger import get_logger, logger
-from .core.database import init_storage, storage
-from .core.rate_limit import rate_limiter
-from .middlewares import ThrottlingMiddleware, AuthMiddleware
+from .core.config import get_settings
+from .core.logger import get_logger, get_app_logger
+from .core.database import init_storage, get_storage
+from .core.rate_limit import get_rate_limiter
+from .middlewares import ThrottlingMiddleware, AuthMiddleware, OutgoingThrottlingMiddleware
 from .handlers import private_router, channel_router, comments_router, group_events_router, menu_router
 
+# Optional speedups
+try:
+    import aiodns
+except ImportError:
+    aiodns = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Initialize logger
 bot_logger = get_logger(__name__)
 
 
+def _install_uvloop() -> bool:
+    """Use uvloop's libuv-based event loop when it is installed."""
+    if sys.platform == "win32":
+        return False
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+# Must run before the event loop is created by asyncio.run()
+if _install_uvloop():
+    bot_logger.info("Using uvloop event loop")
+
+
+def _dumps(data: Any) -> bytes:
+    """Serialize data to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+
+def _json_response(data: Any, status: int = 200) -> web.Response:
+    """Build a JSON response from data."""
+    return web.Response(body=_dumps(data), status=status, content_type="application/json")
+
+
+# Routers included into the dispatcher, in registration order
+_ROUTERS = (private_router, channel_router, comments_router, group_events_router, menu_router)
+
+
+def _collect_update_types(*routers: Router) -> Tuple[str, ...]:
+    """Collect update types that have at least one registered handler."""
+    update_types: Dict[str, None] = {}
+    for router in routers:
+        for update_type in router.resolve_used_update_types():
+            update_types[update_type] = None
+    return tuple(update_types)
+
+
+# Update types requested from Telegram (shared by polling and webhook modes)
+ALLOWED_UPDATES: Tuple[str, ...] = _collect_update_types(*_ROUTERS)
+
+# Pending connection queue size for the webhook server socket
+WEBHOOK_BACKLOG = 4096
+
+# Callbacks running longer than this (seconds) are logged when DEBUG_EVENT_LOOP is on
+SLOW_CALLBACK_THRESHOLD = 0.02
+
+# Health check cache lifetimes (seconds)
+BOT_HEALTH_CACHE_TTL = 30
+DB_HEALTH_CACHE_TTL = 5
+
+# Bot commands shown in the '/' autocomplete menu, built once at import
+_EN_COMMANDS: Tuple[BotCommand, ...] = (
+    BotCommand(command="start", description="🚀 Start working with the bot"),
+    BotCommand(command="menu", description="🏠 Main menu with all options"),
+    BotCommand(command="help", description="❓ Get detailed help"),
+    BotCommand(command="setup", description="📋 Setup instructions for channels"),
+    BotCommand(command="languages", description="🌐 Change interface language"),
+    BotCommand(command="my_channels", description="💬 Show my connected channel chats"),
+    BotCommand(command="set_my_lang", description="🔧 Set your preferred language"),
+    BotCommand(command="privacy", description="🔒 Privacy policy"),
+    BotCommand(command="provider", description="⚙️ Translation provider info"),
+    BotCommand(command="set_channel_langs", description="👑 [Admin] Set channel languages"),
+    BotCommand(command="toggle_autotranslate", description="👑 [Admin] Toggle auto-translation"),
+    BotCommand(command="stats", description="👑 [Admin] Translation statistics"),
+)
+
+_RU_COMMANDS: Tuple[BotCommand, ...] = (
+    BotCommand(command="start", description="🚀 Начать работу с ботом"),
+    BotCommand(command="menu", description="🏠 Главное меню со всеми опциями"),
+    BotCommand(command="help", description="❓ Получить подробную помощь"),
+    BotCommand(command="setup", description="📋 Инструкции по настройке каналов"),
+    BotCommand(command="languages", description="🌐 Изменить язык интерфейса"),
+    BotCommand(command="my_channels", description="💬 Показать мои чаты каналов"),
+    BotCommand(command="set_my_lang", description="🔧 Установить предпочитаемый язык"),
+    BotCommand(command="privacy", description="🔒 Политика конфиденциальности"),
+    BotCommand(command="provider", description="⚙️ Информация о провайдере переводов"),
+    BotCommand(command="set_channel_langs", description="👑 [Админ] Установить языки канала"),
+    BotCommand(command="toggle_autotranslate", description="👑 [Админ] Переключить автоперевод"),
+    BotCommand(command="stats", description="👑 [Админ] Статистика переводов"),
+)
+
+# Pre-serialized command payloads, so setMyCommands skips per-call validation
+_EN_COMMANDS_PAYLOAD: List[Dict[str, Any]] = [c.model_dump(exclude_none=True) for c in _EN_COMMANDS]
+_RU_COMMANDS_PAYLOAD: List[Dict[str, Any]] = [c.model_dump(exclude_none=True) for c in _RU_COMMANDS]
+
+# Command scopes, built once
+_RU_SCOPE = BotCommandScopeDefault()
+_PRIVATE_CHATS_SCOPE = BotCommandScopeAllPrivateChats()
+
+# Bot interface language -> (Telegram language_code, command payload)
+_LANG_MAP: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {
+    "ru": ("ru", _RU_COMMANDS_PAYLOAD),
+    "en": ("en", _EN_COMMANDS_PAYLOAD),
+}
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """Webhook handler that answers Telegram immediately and caps in-flight updates.
+    
+    Updates are processed as background tasks; once `max_in_flight` tasks are
+    running, new requests wait for a free slot before being acknowledged, which
+    makes Telegram slow down deliveries instead of piling up tasks in memory.
+    
+    Overrides aiogram's private `_handle_request_background` and reuses its
+    `_background_feed_update_tasks` set, so it is tied to aiogram 3.13.x
+    (pinned in requirements.txt and pyproject.toml); re-check on upgrade.
+    """
+    
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, max_in_flight: int, **kwargs: Any):
+        super().__init__(dispatcher=dispatcher, bot=bot, handle_in_background=True, **kwargs)
+        self._slots = asyncio.Semaphore(max_in_flight)
+    
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        if self._slots.locked():
+            bot_logger.warning("Webhook update limit reached, applying backpressure")
+        await self._slots.acquire()
+        
+        try:
+            update = await request.json(loads=bot.session.json_loads)
+        except BaseException:
+            # Includes CancelledError on client disconnect or shutdown
+            self._slots.release()
+            raise
+        
+        feed_update_task = asyncio.create_task(self._background_feed_update(bot=bot, update=update))
+        self._background_feed_update_tasks.add(feed_update_task)
+        feed_update_task.add_done_callback(self._background_feed_update_tasks.discard)
+        feed_update_task.add_done_callback(lambda _: self._slots.release())
+        return web.Response(body=b"{}", content_type="application/json")
+
+
 class TranslationBot:
     """Main bot class."""
     
+    __slots__ = (
+        "bot",
+        "dp",
+        "app",
+        "_initialized",
+        "_commands_set",
+        "_me_cache",
+        "_db_health_cache",
+        "_root_body",
+        "_healthy_body",
+    )
+    
     def __init__(self):
         self.bot: Optional[Bot] = None
         self.dp: Optional[Dispatcher] = None
         self.app: Optional[web.Application] = None
         self._initialized = False
+        # Language codes whose private-chat commands are already set in Telegram
+        self._commands_set: Set[str] = set()
+        # (monotonic timestamp, result) of the last successful health probes
+        self._me_cache: Optional[Tuple[float, Any]] = None
+        self._db_health_cache: Optional[Tuple[float, bool]] = None
+        self._root_body = b""
+        self._healthy_body = b""
     
     async def initialize(self):
         """Initialize bot components."""
+        settings = get_settings()
         if self._initialized:
             return
         
@@ -44,9 +219,13 @@ class TranslationBot:
         # Create bot instance
         self.bot = Bot(
             token=settings.bot_token,
+            session=self._create_session(),
             default=DefaultBotProperties(parse_mode=ParseMode.HTML)
         )
         
+        # Queue outgoing API calls to stay within Telegram rate limits
+        self.bot.session.middleware(OutgoingThrottlingMiddleware())
+        
         # Create dispatcher
         self.dp = Dispatcher()
         
@@ -57,53 +236,109 @@ class TranslationBot:
         self.dp.callback_query.middleware(auth_middleware)
         
         # Include routers
-        self.dp.include_router(private_router)
-        self.dp.include_router(channel_router)
-        self.dp.include_router(comments_router)
-        self.dp.include_router(group_events_router)
-        self.dp.include_router(menu_router)
+        for router in _ROUTERS:
+            self.dp.include_router(router)
         
         # Setup startup and shutdown handlers
         self.dp.startup.register(self._on_startup)
         self.dp.shutdown.register(self._on_shutdown)
         
+        # Static response bodies, serialized once per worker process
+        self._healthy_body = _dumps({
+            "status": "healthy",
+            "database": "ok",
+            "bot": "ok",
+            "pid": os.getpid()
+        })
+        self._root_body = _dumps({
+            "service": "Telegram Translation Bot",
+            "status": "running",
+            "mode": settings.mode
+        })
+        
+        # HTTP application with health check routes (shared by polling and webhook modes)
+        self.app = web.Application()
+        self.app.router.add_get("/health", self._health_check)
+        self.app.router.add_get("/", self._root_handler)
+        
         self._initialized = True
         bot_logger.info("Bot initialized successfully")
     
+    @staticmethod
+    def _create_session() -> AiohttpSession:
+        """Create a Bot API session with a connection pool tuned for bursts."""
+        session = AiohttpSession(limit=256)
+        # Keep connections to api.telegram.org alive and avoid repeated DNS lookups
+        session._connector_init.update(
+            limit_per_host=64,
+            ttl_dns_cache=300,
+            keepalive_timeout=75,
+            enable_cleanup_closed=True,
+        )
+        # Resolve DNS on the event loop instead of a thread pool when aiodns is installed
+        if aiodns is not None:
+            session._connector_init["resolver"] = AsyncResolver()
+        return session
+    
     async def _on_startup(self):
         """Handle bot startup."""
         bot_logger.info("Bot is starting up...")
         
         # Rate limiter cleanup task starts automatically
         
-        # Get bot info
-        bot_info = await self.bot.get_me()
-        bot_logger.info(f"Bot started: @{bot_info.username} ({bot_info.full_name})")
+        # Bot info, commands and webhook configuration are independent requests
+        bot_info, _, _, webhook_result = await asyncio.gather(
+            self.bot.get_me(),
+            self._set_bot_commands(),
+            self.refresh_all_languages(),
+            self._configure_webhook(),
+            return_exceptions=True
+        )
         
-        # Set bot commands for autocomplete
-        await self._set_bot_commands()
+        if isinstance(bot_info, BaseException):
+            bot_logger.error(f"Failed to get bot info: {bot_info}")
+            raise bot_info
+        self._me_cache = (time.monotonic(), bot_info)
+        bot_logger.info(f"Bot started: @{bot_info.username} ({bot_info.full_name})")
         
+        if isinstance(webhook_result, BaseException):
+            bot_logger.error(f"Failed to configure webhook: {webhook_result}")
+            raise webhook_result
+    
+    async def _configure_webhook(self):
+        """Set the webhook in webhook mode, otherwise make sure it is removed."""
+        settings = get_settings()
         # Set webhook if in webhook mode
         if settings.mode == "webhook" and settings.webhook_url:
             webhook_url = f"{settings.webhook_url}/webhook"
-            await self.bot.set_webhook(webhook_url)
+            await self.bot.set_webhook(webhook_url, allowed_updates=list(ALLOWED_UPDATES))
             bot_logger.info(f"Webhook set to: {webhook_url}")
         else:
             # Delete webhook for polling mode to avoid conflicts
             try:
                 await self.bot.delete_webhook(drop_pending_updates=True)
                 bot_logger.info("Webhook deleted, using polling mode")
-                # Small delay to ensure webhook is fully deleted
-                await asyncio.sleep(1)
+                await self._wait_webhook_deleted()
             except Exception as e:
                 bot_logger.warning(f"Failed to delete webhook: {e}")
     
+    async def _wait_webhook_deleted(self, attempts: int = 10, interval: float = 0.1) -> bool:
+        """Wait until Telegram reports no webhook URL, polling getWebhookInfo."""
+        for _ in range(attempts):
+            info = await self.bot.get_webhook_info()
+            if not info.url:
+                return True
+            await asyncio.sleep(interval)
+        
+        bot_logger.warning("Webhook still reported as set after deletion")
+        return False
+    
     async def _on_shutdown(self):
         """Handle bot shutdown."""
         bot_logger.info("Bot is shutting down...")
         
         # Stop rate limiter cleanup
-        rate_limiter.stop_cleanup()
+        get_rate_limiter().stop_cleanup()
         
         # Stop polling gracefully
         if self.dp:
@@ -123,55 +358,78 @@ class TranslationBot:
         
         bot_logger.info("Bot shutdown complete")
     
+    async def _send_commands(self, commands: List[Dict[str, Any]], **kwargs) -> bool:
+        """Call setMyCommands with an already serialized command list."""
+        return await self.bot(SetMyCommands.model_construct(commands=commands, **kwargs))
+    
     async def _set_bot_commands(self):
         """Set bot commands for autocomplete when user types '/'."""
-        # English commands (default)
-        en_commands = [
-            BotCommand(command="start", description="🚀 Start working with the bot"),
-            BotCommand(command="menu", description="🏠 Main menu with all options"),
-            BotCommand(command="help", description="❓ Get detailed help"),
-            BotCommand(command="setup", description="📋 Setup instructions for channels"),
-            BotCommand(command="languages", description="🌐 Change interface language"),
-            BotCommand(command="my_channels", description="💬 Show my connected channel chats"),
-            BotCommand(command="set_my_lang", description="🔧 Set your preferred language"),
-            BotCommand(command="privacy", description="🔒 Privacy policy"),
-            BotCommand(command="provider", description="⚙️ Translation provider info"),
-            BotCommand(command="set_channel_langs", description="👑 [Admin] Set channel languages"),
-            BotCommand(command="toggle_autotranslate", description="👑 [Admin] Toggle auto-translation"),
-            BotCommand(command="stats", description="👑 [Admin] Translation statistics"),
-        ]
-        
-        # Russian commands
-        ru_commands = [
-            BotCommand(command="start", description="🚀 Начать работу с ботом"),
-            BotCommand(command="menu", description="🏠 Главное меню со всеми опциями"),
-            BotCommand(command="help", description="❓ Получить подробную помощь"),
-            BotCommand(command="setup", description="📋 Инструкции по настройке каналов"),
-            BotCommand(command="languages", description="🌐 Изменить язык интерфейса"),
-            BotCommand(command="my_channels", description="💬 Показать мои чаты каналов"),
-            BotCommand(command="set_my_lang", description="🔧 Установить предпочитаемый язык"),
-            BotCommand(command="privacy", description="🔒 Политика конфиденциальности"),
-            BotCommand(command="provider", description="⚙️ Информация о провайдере переводов"),
-            BotCommand(command="set_channel_langs", description="👑 [Админ] Установить языки канала"),
-            BotCommand(command="toggle_autotranslate", description="👑 [Админ] Переключить автоперевод"),
-            BotCommand(command="stats", description="👑 [Админ] Статистика переводов"),
-        ]
+        # Default (English) and Russian commands are independent, so set them concurrently
+        results = await asyncio.gather(
+            self._send_commands(_EN_COMMANDS_PAYLOAD),
+            self._send_commands(
+                _RU_COMMANDS_PAYLOAD,
+                scope=_RU_SCOPE,
+                language_code="ru"
+            ),
+            return_exceptions=True
+        )
+        
+        failed = False
+        for lang, result in zip(("en", "ru"), results):
+            if isinstance(result, BaseException):
+                failed = True
+                bot_logger.error(f"Failed to set bot commands ({lang}): {result}")
+        
+        if not failed:
+            bot_logger.info("Bot commands set successfully for both languages")
+    
+    async def _set_commands_for_lang(self, user_lang: str) -> bool:
+        """Set private chat commands for one bot language; returns True on success."""
+        # Map bot language to Telegram language code and commands
+        # Note: language_code must match user's Telegram interface language for this to work
+        telegram_lang_code, commands = _LANG_MAP.get(user_lang, _LANG_MAP["en"])
+        
+        # The scope is shared by all private chats, so each language only needs setting once
+        if telegram_lang_code in self._commands_set:
+            bot_logger.debug(f"Commands for language_code={telegram_lang_code} already set, skipping")
+            return True
+        
+        # Try to set commands for all private chats with the specified language
+        # This will only work if the user's Telegram interface language matches
+        scope = _PRIVATE_CHATS_SCOPE
         
         try:
-            # Set default commands (English)
-            await self.bot.set_my_commands(en_commands)
-            
-            # Set Russian commands for Russian language scope
-            from aiogram.types import BotCommandScopeDefault
-            await self.bot.set_my_commands(
-                ru_commands, 
-                scope=BotCommandScopeDefault(),
-                language_code="ru"
+            await self._send_commands(
+                commands,
+                scope=scope,
+                language_code=telegram_lang_code
             )
+            self._commands_set.add(telegram_lang_code)
+            bot_logger.info(f"Successfully set commands for private chats with language_code={telegram_lang_code}")
+            return True
+        except Exception as scope_error:
+            # If language_code doesn't work, try without it
+            bot_logger.warning(f"Could not set commands with language_code: {scope_error}")
+            try:
+                await self._send_commands(commands, scope=scope)
+                bot_logger.info(f"Set commands without language_code ({user_lang})")
+            except Exception as e:
+                bot_logger.warning(f"Could not set commands for language {user_lang}: {e}")
+            return False
+    
+    async def refresh_all_languages(self):
+        """Set private chat commands once per language present in the user base."""
+        try:
+            langs = await get_storage().distinct_user_languages()
+            langs.add(get_settings().default_user_lang)
             
-            bot_logger.info("Bot commands set successfully for both languages")
+            # Several bot languages may share one Telegram language code
+            unique = {_LANG_MAP.get(lang, _LANG_MAP["en"])[0] for lang in langs}
+            await asyncio.gather(*(self._set_commands_for_lang(lang) for lang in unique))
+            bot_logger.info(f"Commands refreshed for languages: {', '.join(sorted(unique))}")
         except Exception as e:
-            bot_logger.error(f"Failed to set bot commands: {e}")
+            bot_logger.error(f"Failed to refresh commands for all languages: {e}")
     
     async def update_user_commands(self, user_id: int, user_lang: str):
         """Update bot commands for a specific user based on their language preference.
@@ -180,93 +438,64 @@ class TranslationBot:
         Telegram interface language, not the bot's language setting. However, we try to set
         commands for all private chats with the appropriate language_code.
         """
-        from aiogram.types.bot_command_scope_all_private_chats import BotCommandScopeAllPrivateChats
-        
-        # English commands
-        en_commands = [
-            BotCommand(command="start", description="🚀 Start working with the bot"),
-            BotCommand(command="menu", description="🏠 Main menu with all options"),
-            BotCommand(command="help", description="❓ Get detailed help"),
-            BotCommand(command="setup", description="📋 Setup instructions for channels"),
-            BotCommand(command="languages", description="🌐 Change interface language"),
-            BotCommand(command="my_channels", description="💬 Show my connected channel chats"),
-            BotCommand(command="set_my_lang", description="🔧 Set your preferred language"),
-            BotCommand(command="privacy", description="🔒 Privacy policy"),
-            BotCommand(command="provider", description="⚙️ Translation provider info"),
-            BotCommand(command="set_channel_langs", description="👑 [Admin] Set channel languages"),
-            BotCommand(command="toggle_autotranslate", description="👑 [Admin] Toggle auto-translation"),
-            BotCommand(command="stats", description="👑 [Admin] Translation statistics"),
-        ]
-        
-        # Russian commands
-        ru_commands = [
-            BotCommand(command="start", description="🚀 Начать работу с ботом"),
-            BotCommand(command="menu", description="🏠 Главное меню со всеми опциями"),
-            BotCommand(command="help", description="❓ Получить подробную помощь"),
-            BotCommand(command="setup", description="📋 Инструкции по настройке каналов"),
-            BotCommand(command="languages", description="🌐 Изменить язык интерфейса"),
-            BotCommand(command="my_channels", description="💬 Показать мои чаты каналов"),
-            BotCommand(command="set_my_lang", description="🔧 Установить предпочитаемый язык"),
-            BotCommand(command="privacy", description="🔒 Политика конфиденциальности"),
-            BotCommand(command="provider", description="⚙️ Информация о провайдере переводов"),
-            BotCommand(command="set_channel_langs", description="👑 [Админ] Установить языки канала"),
-            BotCommand(command="toggle_autotranslate", description="👑 [Админ] Переключить автоперевод"),
-            BotCommand(command="stats", description="👑 [Админ] Статистика переводов"),
-        ]
-        
         try:
-            # Select commands based on user's language preference
-            commands = ru_commands if user_lang == "ru" else en_commands
-            
-            bot_logger.info(f"Updating commands for user {user_id} (language: {user_lang})")
-            
-            # Map bot language to Telegram language code
-            # Note: language_code must match user's Telegram interface language for this to work
-            telegram_lang_code = "ru" if user_lang == "ru" else "en"
-            
-            # Try to set commands for all private chats with the specified language
-            # This will only work if the user's Telegram interface language matches
-            scope = BotCommandScopeAllPrivateChats()
-            
-            try:
-                await self.bot.set_my_commands(
-                    commands,
-                    scope=scope,
-                    language_code=telegram_lang_code
-                )
-                bot_logger.info(f"Successfully set commands for private chats with language_code={telegram_lang_code}")
-            except Exception as scope_error:
-                # If language_code doesn't work, try without it
-                bot_logger.warning(f"Could not set commands with language_code: {scope_error}")
-                try:
-                    await self.bot.set_my_commands(commands, scope=scope)
-                    bot_logger.info(f"Set commands without language_code for user {user_id}")
-                except Exception as e:
-                    bot_logger.warning(f"Could not set commands for user {user_id}: {e}")
-            
-            # Log first command description for verification
-            first_cmd_desc = commands[0].description if commands else "N/A"
-            bot_logger.info(f"Commands updated for user {user_id} to {user_lang}. First command: {first_cmd_desc}")
-            
+            if await self._set_commands_for_lang(user_lang):
+                bot_logger.info(f"Commands updated for user {user_id} to {user_lang}")
         except Exception as e:
-            bot_logger.error(f"Failed to update commands for user {user_id}: {e}", exc_info=True)
+            # Tracebacks are only worth formatting when debugging
+            bot_logger.error(
+                f"Failed to update commands for user {user_id}: {e}",
+                exc_info=bot_logger.isEnabledFor(logging.DEBUG)
+            )
+    
+    def _pin_cpu(self):
+        """Pin this worker process to a single CPU core when BOT_AFFINITY is enabled."""
+        settings = get_settings()
+        if not settings.bot_affinity:
+            return
+        if not hasattr(os, "sched_setaffinity"):
+            bot_logger.warning("CPU affinity is not supported on this platform")
+            return
+        
+        try:
+            os.sched_setaffinity(0, {settings.bot_cpu})
+            bot_logger.info(f"Worker {os.getpid()} pinned to CPU {settings.bot_cpu}")
+        except OSError as e:
+            bot_logger.warning(f"Failed to pin worker to CPU {settings.bot_cpu}: {e}")
+    
+    def _enable_event_loop_monitor(self):
+        """Log event loop callbacks that block longer than the threshold (development aid)."""
+        if not get_settings().debug_event_loop:
+            return
+        
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = SLOW_CALLBACK_THRESHOLD
+        
+        # asyncio reports slow callbacks through its own logger; route it to ours
+        asyncio_logger = logging.getLogger("asyncio")
+        asyncio_logger.setLevel(logging.WARNING)
+        for handler in logging.getLogger("telegram_translator").handlers:
+            if handler not in asyncio_logger.handlers:
+                asyncio_logger.addHandler(handler)
+        
+        bot_logger.warning(
+            f"Event loop monitor enabled (threshold {SLOW_CALLBACK_THRESHOLD * 1000:.0f} ms)"
+        )
     
     async def start_polling(self):
         """Start bot in polling mode with health check server."""
+        settings = get_settings()
         if not self._initialized:
             await self.initialize()
         
         bot_logger.info("Starting bot in polling mode...")
+        self._enable_event_loop_monitor()
         
         # Start health check HTTP server for Render compatibility
         host = settings.host
         port = settings.port
         
-        # Create simple HTTP server for health check
-        self.app = web.Application()
-        self.app.router.add_get("/health", self._health_check)
-        self.app.router.add_get("/", self._root_handler)
-        
         runner = web.AppRunner(self.app)
         await runner.setup()
         site = web.TCPSite(runner, host, port)
@@ -275,9 +504,6 @@ class TranslationBot:
         bot_logger.info(f"Health check server started on http://{host}:{port}")
         
         try:
-            # Small delay before starting polling to avoid conflicts with previous instance
-            await asyncio.sleep(2)
-            
             # Start polling with error handling for conflicts
             polling_task = asyncio.create_task(self._start_polling_with_retry())
             
@@ -299,7 +525,12 @@ class TranslationBot:
         for attempt in range(max_retries):
             try:
                 bot_logger.info(f"Starting polling (attempt {attempt + 1}/{max_retries})...")
-                await self.dp.start_polling(self.bot, allowed_updates=["message", "callback_query", "chat_member"])
+                await self.dp.start_polling(
+                    self.bot,
+                    allowed_updates=list(ALLOWED_UPDATES),
+                    handle_as_tasks=True,
+                    polling_timeout=get_settings().polling_timeout
+                )
                 break  # Success, exit retry loop
             except TelegramConflictError as e:
                 if attempt < max_retries - 1:
@@ -312,7 +543,7 @@ class TranslationBot:
                     # Try to delete webhook again
                     try:
                         await self.bot.delete_webhook(drop_pending_updates=True)
-                        await asyncio.sleep(2)
+                        await self._wait_webhook_deleted()
                     except Exception as webhook_error:
                         bot_logger.warning(f"Failed to delete webhook during retry: {webhook_error}")
                 else:
@@ -322,8 +553,22 @@ class TranslationBot:
                 bot_logger.error(f"Unexpected error during polling: {e}")
                 raise
     
+    def _setup_webhook_app(self):
+        """Register the webhook handler and dispatcher lifecycle on the app."""
+        # Setup webhook handler
+        webhook_requests_handler = BoundedRequestHandler(
+            dispatcher=self.dp,
+            bot=self.bot,
+            max_in_flight=get_settings().webhook_max_in_flight
+        )
+        webhook_requests_handler.register(self.app, path="/webhook")
+        
+        # Setup application
+        setup_application(self.app, self.dp, bot=self.bot)
+    
     async def start_webhook(self, host: str = None, port: int = None):
         """Start bot in webhook mode."""
+        settings = get_settings()
         if not self._initialized:
             await self.initialize()
         
@@ -331,87 +576,110 @@ class TranslationBot:
         port = port or settings.port
         
         bot_logger.info(f"Starting bot in webhook mode on {host}:{port}")
+        self._enable_event_loop_monitor()
+        self._pin_cpu()
         
-        # Create web application
-        self.app = web.Application()
-        
-        # Setup webhook handler
-        webhook_requests_handler = SimpleRequestHandler(
-            dispatcher=self.dp,
-            bot=self.bot
-        )
-        webhook_requests_handler.register(self.app, path="/webhook")
-        
-        # Add health check endpoint
-        self.app.router.add_get("/health", self._health_check)
-        self.app.router.add_get("/", self._root_handler)
-        
-        # Setup application
-        setup_application(self.app, self.dp, bot=self.bot)
+        self._setup_webhook_app()
         
         # Start web server
         runner = web.AppRunner(self.app)
         await runner.setup()
         
-        site = web.TCPSite(runner, host, port)
+        # SO_REUSEPORT lets several processes share the port where the OS supports it
+        site = web.TCPSite(
+            runner,
+            host,
+            port,
+            backlog=WEBHOOK_BACKLOG,
+            reuse_port=sys.platform != "win32"
+        )
         await site.start()
         
         bot_logger.info(f"Webhook server started on http://{host}:{port}")
         
+        # Stop serving on SIGINT/SIGTERM so cleanup runs on the normal code path
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        installed_signals = []
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+                installed_signals.append(sig)
+            except (NotImplementedError, RuntimeError):
+                # Signal handlers are unavailable (e.g. on Windows)
+                pass
+        
         try:
-            # Keep the server running
-            await asyncio.Future()  # Run forever
+            # Keep the server running until a stop signal arrives
+            await stop_event.wait()
+            bot_logger.info("Received stop signal")
         except KeyboardInterrupt:
             bot_logger.info("Received interrupt signal")
         except Exception as e:
             bot_logger.error(f"Error in webhook server: {e}")
             raise
         finally:
+            for sig in installed_signals:
+                loop.remove_signal_handler(sig)
             await runner.cleanup()
             await self._cleanup()
     
+    async def _check_database(self) -> bool:
+        """Check database health (cached briefly to absorb probe bursts)."""
+        now = time.monotonic()
+        if self._db_health_cache and now - self._db_health_cache[0] < DB_HEALTH_CACHE_TTL:
+            return self._db_health_cache[1]
+        
+        # Round-trip SQLite: a live worker thread alone misses a locked or broken file
+        db_healthy = await get_storage().health_check(deep=True)
+        self._db_health_cache = (now, db_healthy)
+        return db_healthy
+    
+    async def _check_bot(self) -> bool:
+        """Check bot connection, reusing the identity cached at startup or by a recent probe."""
+        now = time.monotonic()
+        if self._me_cache and now - self._me_cache[0] < BOT_HEALTH_CACHE_TTL:
+            return True
+        if not self.bot:
+            return False
+        
+        try:
+            me = await self.bot.get_me()
+            self._me_cache = (now, me)
+            return True
+        except Exception:
+            self._me_cache = None
+            return False
+    
     async def _health_check(self, request):
         """Health check endpoint."""
         try:
-            # Check database health
-            db_healthy = await storage.health_check()
-            
-            # Check bot connection
-            bot_healthy = False
-            if self.bot:
-                try:
-                    await self.bot.get_me()
-                    bot_healthy = True
-                except Exception:
-                    pass
+            # Both checks are usually served from cache; overlap them when they are not
+            db_healthy, bot_healthy = await asyncio.gather(
+                self._check_database(),
+                self._check_bot()
+            )
             
             if db_healthy and bot_healthy:
-                return web.json_response({
-                    "status": "healthy",
-                    "database": "ok",
-                    "bot": "ok"
-                })
+                return web.Response(body=self._healthy_body, content_type="application/json")
             else:
-                return web.json_response({
+                return _json_response({
                     "status": "unhealthy",
                     "database": "ok" if db_healthy else "error",
-                    "bot": "ok" if bot_healthy else "error"
+                    "bot": "ok" if bot_healthy else "error",
+                    "pid": os.getpid()
                 }, status=503)
                 
         except Exception as e:
-            bot_logger.error(f"Health check error: {e}")
-            return web.json_response({
+            bot_logger.error(f"Health check error: {e}", exc_info=bot_logger.isEnabledFor(logging.DEBUG))
+            return _json_response({
                 "status": "error",
                 "message": str(e)
             }, status=500)
     
     async def _root_handler(self, request):
         """Root endpoint handler."""
-        return web.json_response({
-            "service": "Telegram Translation Bot",
-            "status": "running",
-            "mode": settings.mode
-        })
+        return web.Response(body=self._root_body, content_type="application/json")
     
     async def _cleanup(self):
         """Cleanup resources."""
@@ -419,40 +687,55 @@ class TranslationBot:
         
         # Close database connections
         try:
-            # Storage cleanup is handled automatically by aiosqlite
-            pass
+            await get_storage().close()
         except Exception as e:
             bot_logger.error(f"Error cleaning up storage: {e}")
 
 
-# Global bot instance
-translation_bot = TranslationBot()
+@lru_cache(maxsize=None)
+def get_bot() -> TranslationBot:
+    """Get the global bot instance, creating it on first use."""
+    return TranslationBot()
 
 
-@asynccontextmanager
-async def lifespan(app: web.Application):
-    """Application lifespan manager for webhook mode."""
-    # Startup
-    await translation_bot.initialize()
-    yield
-    # Shutdown
-    await translation_bot._cleanup()
+def __getattr__(name: str) -> Any:
+    """Lazily resolve the module-level `translation_bot` instance."""
+    if name == "translation_bot":
+        return get_bot()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-def create_app() -> web.Application:
-    """Create web application for webhook mode."""
-    app = web.Application()
+async def create_app() -> web.Application:
+    """Create the fully configured webhook application.
     
-    # This will be called by uvicorn or other ASGI servers
-    # The actual webhook setup happens in start_webhook()
+    Intended for serving with external workers, e.g.:
+    gunicorn app.bot:create_app -k aiohttp.GunicornUVLoopWebWorker --workers 2
+    """
+    get_app_logger()
+    translation_bot = get_bot()
+    await translation_bot.initialize()
+    translation_bot._setup_webhook_app()
+    
+    # The worker owns the app's lifecycle here, so close storage (final stats
+    # flush, PRAGMA optimize) when it shuts the app down
+    async def cleanup_storage(app: web.Application):
+        await translation_bot._cleanup()
     
-    return app
+    translation_bot.app.on_cleanup.append(cleanup_storage)
+    return translation_bot.app
 
 
 async def run_bot():
-    """Run bot based on configuration."""
+    """Run bot based on configuration.
+    
+    Webhook mode is used whenever WEBHOOK_URL is configured; MODE=polling
+    forces long polling (intended for local development).
+    """
+    get_app_logger()
+    settings = get_settings()
+    translation_bot = get_bot()
     try:
-        if settings.mode == "webhook":
+        if settings.mode == "webhook" and settings.webhook_url:
             await translation_bot.start_webhook()
         else:
             await translation_bot.start_polling()
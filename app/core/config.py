@@ -1,11 +1,28 @@
 """Configuration management using Pydantic Settings."""
 
 import os
-from typing import List, Optional
-from pydantic import Field, validator
+from functools import lru_cache
+from typing import Annotated, Any, Literal, Optional, Tuple
+from pydantic import BeforeValidator, Field, PrivateAttr, model_validator
 from pydantic_settings import BaseSettings
 
 
+# Allowed values, validated declaratively by pydantic-core
+TranslatorProvider = Literal["DEEPL", "GOOGLE", "LIBRE", "MYMEMORY", "ARGOS"]
+BotMode = Literal["polling", "webhook"]
+LogLevel = Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+
+def _upper(value: Any) -> Any:
+    """Normalize string values to upper case before validation."""
+    return value.upper() if isinstance(value, str) else value
+
+
+def _lower(value: Any) -> Any:
+    """Normalize string values to lower case before validation."""
+    return value.lower() if isinstance(value, str) else value
+
+
 class Settings(BaseSettings):
     """Application settings with environment variable support."""
     
@@ -13,7 +30,9 @@ class Settings(BaseSettings):
     bot_token: str = Field(..., env="BOT_TOKEN", description="Telegram Bot Token")
     
     # Translation provider settings
-    translator_provider: str = Field("DEEPL", env="TRANSLATOR_PROVIDER", description="Translation provider")
+    translator_provider: Annotated[TranslatorProvider, BeforeValidator(_upper)] = Field(
+        "DEEPL", env="TRANSLATOR_PROVIDER", description="Translation provider"
+    )
     
     # DeepL settings
     deepl_api_key: Optional[str] = Field(None, env="DEEPL_API_KEY")
@@ -35,13 +54,26 @@ class Settings(BaseSettings):
     sentry_dsn: Optional[str] = Field(None, env="SENTRY_DSN")
     
     # Server configuration
-    mode: str = Field("polling", env="MODE", description="Bot mode: polling or webhook")
+    mode: Annotated[Optional[BotMode], BeforeValidator(_lower)] = Field(
+        None,
+        env="MODE",
+        description="Bot mode override: polling or webhook (defaults to webhook when WEBHOOK_URL is set)"
+    )
     webhook_url: Optional[str] = Field(None, env="WEBHOOK_URL")
     port: int = Field(8080, env="PORT")
     host: str = Field("0.0.0.0", env="HOST")
+    polling_timeout: int = Field(30, env="POLLING_TIMEOUT", description="Long polling timeout in seconds")
+    bot_affinity: bool = Field(False, env="BOT_AFFINITY", description="Pin the webhook worker to one CPU")
+    bot_cpu: int = Field(0, env="BOT_CPU", description="CPU core used when BOT_AFFINITY is enabled")
+    webhook_max_in_flight: int = Field(
+        100, env="WEBHOOK_MAX_IN_FLIGHT", description="Max webhook updates processed concurrently"
+    )
     
     # Logging
-    log_level: str = Field("INFO", env="LOG_LEVEL")
+    log_level: Annotated[LogLevel, BeforeValidator(_upper)] = Field("INFO", env="LOG_LEVEL")
+    debug_event_loop: bool = Field(
+        False, env="DEBUG_EVENT_LOOP", description="Log callbacks that block the event loop"
+    )
     
     # Database
     database_url: str = Field("sqlite:///bot.db", env="DATABASE_URL")
@@ -50,37 +82,32 @@ class Settings(BaseSettings):
     rate_limit_requests: int = Field(5, env="RATE_LIMIT_REQUESTS")
     rate_limit_window: int = Field(15, env="RATE_LIMIT_WINDOW")
     
+    # Maximum concurrent requests to translation providers
+    provider_concurrency: int = Field(8, env="PROVIDER_CONCURRENCY")
+    
     # Text processing limits
     max_text_length: int = Field(4096, env="MAX_TEXT_LENGTH")
     max_comment_length: int = Field(3500, env="MAX_COMMENT_LENGTH")
     
-    @validator("translator_provider")
-    def validate_translator_provider(cls, v):
-        """Validate translator provider."""
-        allowed_providers = ["DEEPL", "GOOGLE", "LIBRE", "MYMEMORY", "ARGOS"]
-        if v.upper() not in allowed_providers:
-            raise ValueError(f"Translator provider must be one of: {allowed_providers}")
-        return v.upper()
-    
-    @validator("mode")
-    def validate_mode(cls, v):
-        """Validate bot mode."""
-        allowed_modes = ["polling", "webhook"]
-        if v.lower() not in allowed_modes:
-            raise ValueError(f"Mode must be one of: {allowed_modes}")
-        return v.lower()
-    
-    @validator("log_level")
-    def validate_log_level(cls, v):
-        """Validate log level."""
-        allowed_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
-        if v.upper() not in allowed_levels:
-            raise ValueError(f"Log level must be one of: {allowed_levels}")
-        return v.upper()
-    
-    def get_default_channel_langs(self) -> List[str]:
-        """Get default channel languages as a list."""
-        return [lang.strip() for lang in self.default_channel_langs.split(",") if lang.strip()]
+    # Derived values
+    _default_channel_langs: Tuple[str, ...] = PrivateAttr(default=())
+    
+    @model_validator(mode="after")
+    def resolve_mode(self):
+        """Default to webhook mode when a webhook URL is configured."""
+        if self.mode is None:
+            self.mode = "webhook" if self.webhook_url else "polling"
+        return self
+    
+    def model_post_init(self, __context: Any) -> None:
+        """Precompute derived values once settings are loaded."""
+        self._default_channel_langs = tuple(
+            lang.strip() for lang in self.default_channel_langs.split(",") if lang.strip()
+        )
+    
+    def get_default_channel_langs(self) -> Tuple[str, ...]:
+        """Get default channel languages (parsed once at startup)."""
+        return self._default_channel_langs
     
     class Config:
         """Pydantic configuration."""
@@ -89,5 +116,14 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Get the application settings, reading the environment on first use."""
+    return Settings()
+
+
+def __getattr__(name: str) -> Any:
+    """Lazily resolve the module-level `settings` instance."""
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,68 +1,172 @@
-"""Universal database adapter for SQLite and PostgreSQL."""
+"""SQLite storage for bot settings and statistics."""
 
 import asyncio
+import contextlib
 import os
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any, Union
-from urllib.parse import urlparse
+import time
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Set
 
 import aiosqlite
-try:
-    import psycopg2
-    import psycopg2.pool
-except ImportError:
-    psycopg2 = None
 
-from .config import settings
+from .config import get_settings
 from .logger import get_logger
 from .i18n import parse_language_list
 
 logger = get_logger(__name__)
 
 
+# Per-connection SQLite tuning: WAL lets readers proceed during writes,
+# synchronous=NORMAL avoids an fsync per commit in WAL mode
+SQLITE_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -20000",
+    "PRAGMA busy_timeout = 5000",
+    # Bounds the work PRAGMA optimize does on SQLite builds older than 3.46
+    "PRAGMA analysis_limit = 1000",
+)
+
+# Stored in PRAGMA user_version once the schema is created; bump when the DDL changes
+SCHEMA_VERSION = 1
+
+# Size of sqlite3's per-connection prepared statement cache (default is 128)
+SQLITE_CACHED_STATEMENTS = 256
+
+# In-process settings cache: max entries per cache and seconds before a re-read
+SETTINGS_CACHE_SIZE = 4096
+SETTINGS_CACHE_TTL = 60
+
+# Seconds a cache hit trusts the last PRAGMA data_version check; bounds how long
+# a write from another worker process can go unnoticed
+DATA_VERSION_CHECK_INTERVAL = 1
+
+# Cache lookup result for keys that are absent or expired
+_MISSING = object()
+
+# Seconds between flushes of buffered translation stats to the database
+STATS_FLUSH_INTERVAL = 5
+
+# Seconds between PRAGMA optimize runs on the long-lived connection
+OPTIMIZE_INTERVAL = 6 * 60 * 60
+
+
+# (next local midnight as epoch seconds, today's ISO date)
+_today_cache = (0.0, "")
+
+
+def _today_iso() -> str:
+    """Get today's ISO date, recomputed only when the local day changes."""
+    global _today_cache
+    expires_at, today_iso = _today_cache
+    if time.time() >= expires_at:
+        today = date.today()
+        today_iso = today.isoformat()
+        next_midnight = datetime.combine(today + timedelta(days=1), datetime.min.time())
+        _today_cache = (next_midnight.timestamp(), today_iso)
+    return today_iso
+
+
 class DatabaseError(Exception):
     """Database operation error."""
     pass
 
 
 class UniversalStorage:
-    """Universal storage manager for SQLite and PostgreSQL."""
+    """Storage manager backed by a single SQLite connection."""
+    
+    # Statements are kept as constants so every call passes the identical
+    # string and hits the connection's prepared statement cache
+    _Q_GET_CHANNEL = "SELECT target_langs, autotranslate FROM channel_settings WHERE chat_id = ?"
+    _Q_SET_CHANNEL = """INSERT INTO channel_settings 
+                        (chat_id, target_langs, autotranslate, created_at, updated_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (chat_id) DO UPDATE SET
+                            target_langs = COALESCE(?, target_langs),
+                            autotranslate = COALESCE(?, autotranslate),
+                            updated_at = excluded.updated_at"""
+    _Q_PREWARM_CHANNELS = "SELECT chat_id, target_langs, autotranslate FROM channel_settings ORDER BY updated_at DESC LIMIT ?"
+    _Q_GET_USER = "SELECT target_lang FROM user_settings WHERE user_id = ?"
+    _Q_SET_USER = """INSERT INTO user_settings 
+                     (user_id, target_lang, created_at, updated_at)
+                     VALUES (?, ?, ?, ?)
+                     ON CONFLICT (user_id) DO UPDATE SET
+                         target_lang = excluded.target_lang,
+                         updated_at = excluded.updated_at"""
+    _Q_DISTINCT_USER_LANGS = "SELECT DISTINCT target_lang FROM user_settings"
+    _Q_ADD_USER_CHANNEL = """INSERT OR REPLACE INTO user_channels 
+                             (user_id, channel_id, channel_title, added_at)
+                             VALUES (?, ?, ?, ?)"""
+    _Q_GET_USER_CHANNELS = """SELECT uc.channel_id AS chat_id,
+                                     COALESCE(NULLIF(uc.channel_title, ''), 'Channel ' || uc.channel_id) AS title,
+                                     uc.added_at,
+                                     COALESCE(NULLIF(cs.target_langs, ''), 'en') AS target_langs,
+                                     COALESCE(cs.autotranslate, 1) AS autotranslate,
+                                     cs.created_at, cs.updated_at
+                              FROM user_channels uc
+                              LEFT JOIN channel_settings cs ON uc.channel_id = cs.chat_id
+                              WHERE uc.user_id = ?
+                              ORDER BY uc.added_at DESC"""
+    _Q_RECORD_STATS = """INSERT INTO stats (date, channel_id, posts, translations, created_at)
+                         VALUES (?, ?, ?, ?, ?)
+                         ON CONFLICT (date, channel_id) DO UPDATE SET
+                             posts = posts + excluded.posts,
+                             translations = translations + excluded.translations"""
+    _Q_GET_STATS = """SELECT SUM(posts) as total_posts, 
+                             SUM(translations) as total_translations
+                      FROM stats
+                      WHERE channel_id = ? 
+                      AND date >= ? 
+                      AND date <= ?"""
+    # Answered from the schema cookie in the already-open connection
+    _Q_HEALTH = "PRAGMA schema_version"
+    # Changes whenever another connection (e.g. another worker) commits
+    _Q_DATA_VERSION = "PRAGMA data_version"
     
     def __init__(self, database_url: str = None):
-        self.database_url = database_url or settings.database_url
-        self.db_type = self._detect_db_type()
+        self.database_url = database_url or get_settings().database_url
         self._initialized = False
-        self._pool = None
-    
-    def _detect_db_type(self) -> str:
-        """Detect database type from URL."""
-        # Always use SQLite for now
-        # PostgreSQL support requires asyncpg and is not yet implemented
-        return 'sqlite'
+        # Long-lived SQLite connection shared by all queries
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._lock = asyncio.Lock()
+        self._init_lock = asyncio.Lock()
+        # key -> (expires_at, value), least recently used first
+        self._channel_cache: OrderedDict = OrderedDict()
+        self._user_cache: OrderedDict = OrderedDict()
+        # PRAGMA data_version the cached settings were read under
+        self._data_version: Optional[int] = None
+        self._data_version_checked_at = 0.0
+        # In-memory stats counters: (date, channel_id) -> [posts, translations]
+        self._stats_buffer = defaultdict(lambda: [0, 0])
+        self._stats_task = None
+        self._optimize_task = None
     
     async def initialize(self):
         """Initialize database and create tables."""
         if self._initialized:
             return
         
-        try:
-            if self.db_type == 'postgresql':
-                await self._init_postgresql()
-            else:
-                await self._init_sqlite()
+        # Concurrent startup tasks wait for the first one instead of initializing twice
+        async with self._init_lock:
+            if self._initialized:
+                return
             
-            logger.info(f"Database ({self.db_type}) initialized successfully")
-            self._initialized = True
-            
-        except Exception as e:
-            logger.error(f"Failed to initialize database: {e}")
-            raise DatabaseError(f"Database initialization failed: {e}")
-    
-    async def _init_postgresql(self):
-        """Initialize PostgreSQL connection."""
-        # PostgreSQL support is not fully implemented yet
-        # This is a placeholder for future implementation
-        raise DatabaseError("PostgreSQL support is not yet implemented. Please use SQLite for now.")
+            try:
+                await self._init_sqlite()
+                
+                logger.info("Database (sqlite) initialized successfully")
+                self._initialized = True
+                self._start_stats_flush_task()
+                self._start_optimize_task()
+                
+            except Exception as e:
+                logger.error(f"Failed to initialize database: {e}")
+                raise DatabaseError(f"Database initialization failed: {e}")
     
     async def _init_sqlite(self):
         """Initialize SQLite connection."""
@@ -77,70 +181,55 @@ class UniversalStorage:
         # Create database directory if needed
         os.makedirs(os.path.dirname(db_path) if os.path.dirname(db_path) else '.', exist_ok=True)
         
-        # Create tables
-        async with aiosqlite.connect(db_path) as db:
-            await db.execute("PRAGMA foreign_keys = ON")
-            await self._create_sqlite_tables(db)
-            await db.commit()
-    
-    async def _create_postgresql_tables(self, conn):
-        """Create PostgreSQL tables."""
-        
-        # Channel settings table
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS channel_settings (
-                chat_id BIGINT PRIMARY KEY,
-                target_langs TEXT NOT NULL DEFAULT 'en',
-                autotranslate BOOLEAN NOT NULL DEFAULT TRUE,
-                created_at BIGINT NOT NULL,
-                updated_at BIGINT NOT NULL
-            )
-        """)
-        
-        # User settings table
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS user_settings (
-                user_id BIGINT PRIMARY KEY,
-                target_lang TEXT NOT NULL DEFAULT 'en',
-                created_at BIGINT NOT NULL,
-                updated_at BIGINT NOT NULL
-            )
-        """)
-        
-        # Statistics table
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS stats (
-                id SERIAL PRIMARY KEY,
-                date TEXT NOT NULL,
-                channel_id BIGINT NOT NULL,
-                posts INTEGER NOT NULL DEFAULT 0,
-                translations INTEGER NOT NULL DEFAULT 0,
-                created_at BIGINT NOT NULL
-            )
-        """)
-        
-        # User-Channel relationship table
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS user_channels (
-                id SERIAL PRIMARY KEY,
-                user_id BIGINT NOT NULL,
-                channel_id BIGINT NOT NULL,
-                channel_title TEXT,
-                added_at BIGINT NOT NULL,
-                UNIQUE(user_id, channel_id)
-            )
-        """)
-        
-        # Create indexes
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_stats_date_channel 
-            ON stats(date, channel_id)
-        """)
-        
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_stats_created_at 
-            ON stats(created_at)
-        """)
+        # Open the shared connection and create tables
+        # isolation_level=None: sqlite3 issues no implicit BEGINs; writers open
+        # their own transactions in _write and _executemany
+        self._conn = await aiosqlite.connect(
+            db_path,
+            isolation_level=None,
+            cached_statements=SQLITE_CACHED_STATEMENTS
+        )
+        try:
+            # Rows support both index and column-name access
+            self._conn.row_factory = aiosqlite.Row
+            for pragma in SQLITE_PRAGMAS:
+                await self._conn.execute(pragma)
+            
+            # Skip the DDL when the file already carries the current schema
+            async with self._conn.execute("PRAGMA user_version") as cursor:
+                user_version = (await cursor.fetchone())[0]
+            if user_version != SCHEMA_VERSION:
+                await self._conn.execute("BEGIN IMMEDIATE")
+                await self._create_sqlite_tables(self._conn)
+                await self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                await self._conn.commit()
+            
+            # 0x10002: also consider tables that have never been analyzed (recommended on open)
+            await self._conn.execute("PRAGMA optimize = 0x10002")
+            
+            async with self._conn.execute(self._Q_DATA_VERSION) as cursor:
+                self._data_version = (await cursor.fetchone())[0]
+            self._data_version_checked_at = time.monotonic()
+            await self._prewarm_channel_cache()
+            
+        except BaseException:
+            # Don't leave a half-initialized connection, or the write lock of an
+            # interrupted schema transaction, behind for the next attempt
+            conn, self._conn = self._conn, None
+            with contextlib.suppress(Exception):
+                await conn.rollback()
+            await conn.close()
+            raise
+    
+    async def _prewarm_channel_cache(self):
+        """Load the most recently configured channels into the settings cache."""
+        rows = await self._conn.execute_fetchall(self._Q_PREWARM_CHANNELS, (SETTINGS_CACHE_SIZE,))
+        for row in rows:
+            self._cache_put(self._channel_cache, row[0], {
+                "target_langs": parse_language_list(row[1]),
+                "autotranslate": row[2]
+            })
+        logger.debug(f"Prewarmed settings cache with {len(rows)} channels")
     
     async def _create_sqlite_tables(self, db):
         """Create SQLite tables."""
@@ -174,10 +263,14 @@ class UniversalStorage:
                 channel_id INTEGER NOT NULL,
                 posts INTEGER NOT NULL DEFAULT 0,
                 translations INTEGER NOT NULL DEFAULT 0,
-                created_at INTEGER NOT NULL
+                created_at INTEGER NOT NULL,
+                UNIQUE(date, channel_id)
             )
         """)
         
+        # Databases created before UNIQUE(date, channel_id) need a unique index for UPSERT
+        await self._migrate_sqlite_stats_unique(db)
+        
         # User-Channel relationship table
         await db.execute("""
             CREATE TABLE IF NOT EXISTS user_channels (
@@ -190,61 +283,170 @@ class UniversalStorage:
             )
         """)
         
-        # Create indexes
+        # Create indexes; UNIQUE(date, channel_id) already indexes the stats upsert key
+        await db.execute("DROP INDEX IF EXISTS idx_stats_date_channel")
+        
         await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_stats_date_channel 
-            ON stats(date, channel_id)
+            CREATE INDEX IF NOT EXISTS idx_stats_chan_date 
+            ON stats(channel_id, date)
         """)
         
         await db.execute("""
             CREATE INDEX IF NOT EXISTS idx_stats_created_at 
             ON stats(created_at)
         """)
+        
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_user_channels_user 
+            ON user_channels(user_id, added_at DESC)
+        """)
     
-    async def _execute_query(self, query: str, params: tuple = (), fetch: str = None):
-        """Execute query with appropriate database connection."""
-        if self.db_type == 'postgresql':
-            async with self._pool.acquire() as conn:
-                if fetch == 'one':
-                    return await conn.fetchrow(query, *params)
-                elif fetch == 'all':
-                    return await conn.fetch(query, *params)
-                else:
-                    return await conn.execute(query, *params)
-        else:
-            async with aiosqlite.connect(self.db_path) as db:
-                if fetch == 'one':
-                    async with db.execute(query, params) as cursor:
-                        return await cursor.fetchone()
-                elif fetch == 'all':
-                    async with db.execute(query, params) as cursor:
-                        return await cursor.fetchall()
-                else:
-                    await db.execute(query, params)
-                    await db.commit()
+    async def _migrate_sqlite_stats_unique(self, db):
+        """Merge duplicate daily stats rows and enforce one row per (date, channel_id)."""
+        async with db.execute("PRAGMA index_list(stats)") as cursor:
+            unique_indexes = [row[1] for row in await cursor.fetchall() if row[2]]
+        for index_name in unique_indexes:
+            async with db.execute(f"PRAGMA index_info({index_name})") as cursor:
+                columns = [row[2] for row in await cursor.fetchall()]
+            if columns == ["date", "channel_id"]:
+                return
+        
+        # Fold duplicate rows into the earliest one before adding the unique index
+        await db.execute("""
+            UPDATE stats SET
+                posts = (SELECT SUM(s.posts) FROM stats s
+                         WHERE s.date = stats.date AND s.channel_id = stats.channel_id),
+                translations = (SELECT SUM(s.translations) FROM stats s
+                                WHERE s.date = stats.date AND s.channel_id = stats.channel_id)
+            WHERE id IN (SELECT MIN(id) FROM stats GROUP BY date, channel_id HAVING COUNT(*) > 1)
+        """)
+        await db.execute("""
+            DELETE FROM stats
+            WHERE id NOT IN (SELECT MIN(id) FROM stats GROUP BY date, channel_id)
+        """)
+        await db.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_stats_date_channel_unique
+            ON stats(date, channel_id)
+        """)
+    
+    async def _execute_query(self, query: str, params: tuple = (), fetch: str = 'all'):
+        """Execute a read query on the shared SQLite connection."""
+        async with self._lock:
+            if fetch == 'one':
+                async with self._conn.execute(query, params) as cursor:
+                    return await cursor.fetchone()
+            # Runs and fetches in one hop to the connection thread, without a cursor object
+            return await self._conn.execute_fetchall(query, params)
+    
+    async def _write(self, query: str, params: tuple = ()):
+        """Execute a write in its own transaction.
+        
+        BEGIN IMMEDIATE takes the write lock up front, so with several worker
+        processes on one database file a writer waits on busy_timeout instead of
+        failing with SQLITE_BUSY halfway through a deferred transaction.
+        """
+        async with self._lock:
+            try:
+                await self._conn.execute("BEGIN IMMEDIATE")
+                await self._conn.execute(query, params)
+                await self._conn.commit()
+            except BaseException:
+                # Also on cancellation, or the shared connection is left inside
+                # a transaction holding the write lock
+                await self._conn.rollback()
+                raise
+    
+    async def _executemany(self, query: str, rows: List[tuple]):
+        """Execute a statement for many parameter rows in a single transaction."""
+        async with self._lock:
+            try:
+                await self._conn.execute("BEGIN IMMEDIATE")
+                await self._conn.executemany(query, rows)
+                await self._conn.commit()
+            except BaseException:
+                # Also on cancellation, or the shared connection is left inside
+                # a transaction holding the write lock
+                await self._conn.rollback()
+                raise
+    
+    @staticmethod
+    def _cache_get(cache: OrderedDict, key: int) -> Any:
+        """Get a fresh cached value or _MISSING."""
+        entry = cache.get(key)
+        if entry is None:
+            return _MISSING
+        if entry[0] < time.monotonic():
+            del cache[key]
+            return _MISSING
+        cache.move_to_end(key)
+        return entry[1]
+    
+    @staticmethod
+    def _cache_put(cache: OrderedDict, key: int, value: Any):
+        """Store a value, evicting the least recently used entry when full."""
+        cache[key] = (time.monotonic() + SETTINGS_CACHE_TTL, value)
+        cache.move_to_end(key)
+        if len(cache) > SETTINGS_CACHE_SIZE:
+            cache.popitem(last=False)
+    
+    async def _cache_is_current(self) -> bool:
+        """Check that no other process has written since the settings were cached.
+        
+        Every worker keeps its own cache and only invalidates it for its own
+        writes; another connection's commit bumps PRAGMA data_version, in which
+        case both settings caches are dropped. The check runs at most once per
+        DATA_VERSION_CHECK_INTERVAL, so other hits stay in memory and a foreign
+        write is seen within that interval.
+        """
+        now = time.monotonic()
+        if now - self._data_version_checked_at < DATA_VERSION_CHECK_INTERVAL:
+            return True
+        self._data_version_checked_at = now
+        
+        row = await self._execute_query(self._Q_DATA_VERSION, (), fetch='one')
+        if row[0] == self._data_version:
+            return True
+        
+        self._data_version = row[0]
+        self._channel_cache.clear()
+        self._user_cache.clear()
+        return False
+    
+    def invalidate_channel(self, chat_id: int):
+        """Drop cached settings for a channel so the next read hits the database."""
+        self._channel_cache.pop(chat_id, None)
+    
+    def invalidate_user(self, user_id: int):
+        """Drop cached settings for a user so the next read hits the database."""
+        self._user_cache.pop(user_id, None)
     
     async def get_channel_settings(self, chat_id: int) -> Dict[str, Any]:
+        """Get channel settings, served from the in-process cache when fresh."""
+        cached = self._cache_get(self._channel_cache, chat_id)
+        if cached is not _MISSING and not await self._cache_is_current():
+            cached = _MISSING
+        if cached is _MISSING:
+            cached = await self._fetch_channel_settings(chat_id)
+            self._cache_put(self._channel_cache, chat_id, cached)
+        
+        # Copy the list so callers can modify the result without touching the cache
+        return {**cached, "target_langs": list(cached["target_langs"])}
+    
+    async def _fetch_channel_settings(self, chat_id: int) -> Dict[str, Any]:
         """Get channel settings."""
         try:
-            if self.db_type == 'postgresql':
-                query = "SELECT target_langs, autotranslate FROM channel_settings WHERE chat_id = $1"
-            else:
-                query = "SELECT target_langs, autotranslate FROM channel_settings WHERE chat_id = ?"
-            
-            row = await self._execute_query(query, (chat_id,), fetch='one')
+            row = await self._execute_query(self._Q_GET_CHANNEL, (chat_id,), fetch='one')
             
+            # autotranslate is returned as stored (0/1); callers test its truthiness
             if row:
-                target_langs_str = row[0] if self.db_type == 'postgresql' else row[0]
-                autotranslate = row[1] if self.db_type == 'postgresql' else bool(row[1])
-                
                 return {
-                    "target_langs": parse_language_list(target_langs_str),
-                    "autotranslate": autotranslate
+                    "target_langs": parse_language_list(row[0]),
+                    "autotranslate": row[1]
                 }
             else:
                 return {
-                    "target_langs": settings.get_default_channel_langs(),
-                    "autotranslate": True
+                    "target_langs": list(get_settings().get_default_channel_langs()),
+                    "autotranslate": 1
                 }
                 
         except Exception as e:
@@ -259,50 +461,20 @@ class UniversalStorage:
     ):
         """Set channel settings."""
         try:
-            current_time = int(datetime.now().timestamp())
-            
-            # Get current settings
-            if self.db_type == 'postgresql':
-                query = "SELECT target_langs, autotranslate FROM channel_settings WHERE chat_id = $1"
-            else:
-                query = "SELECT target_langs, autotranslate FROM channel_settings WHERE chat_id = ?"
+            current_time = int(time.time())
             
-            row = await self._execute_query(query, (chat_id,), fetch='one')
+            # Values for a new row; for an existing row only the provided fields change
+            new_langs = ",".join(target_langs) if target_langs else None
+            new_auto = int(autotranslate) if autotranslate is not None else None
+            insert_langs = new_langs or get_settings().default_channel_langs
+            insert_auto = new_auto if new_auto is not None else 1
             
-            if row:
-                # Update existing settings
-                current_langs = row[0]
-                current_auto = row[1] if self.db_type == 'postgresql' else bool(row[1])
-                
-                new_langs = ",".join(target_langs) if target_langs else current_langs
-                new_auto = autotranslate if autotranslate is not None else current_auto
-                
-                if self.db_type == 'postgresql':
-                    query = """UPDATE channel_settings 
-                               SET target_langs = $1, autotranslate = $2, updated_at = $3
-                               WHERE chat_id = $4"""
-                else:
-                    query = """UPDATE channel_settings 
-                               SET target_langs = ?, autotranslate = ?, updated_at = ?
-                               WHERE chat_id = ?"""
-                
-                await self._execute_query(query, (new_langs, new_auto, current_time, chat_id))
-            else:
-                # Insert new settings
-                new_langs = ",".join(target_langs) if target_langs else settings.default_channel_langs
-                new_auto = autotranslate if autotranslate is not None else True
-                
-                if self.db_type == 'postgresql':
-                    query = """INSERT INTO channel_settings 
-                               (chat_id, target_langs, autotranslate, created_at, updated_at)
-                               VALUES ($1, $2, $3, $4, $5)"""
-                else:
-                    query = """INSERT INTO channel_settings 
-                               (chat_id, target_langs, autotranslate, created_at, updated_at)
-                               VALUES (?, ?, ?, ?, ?)"""
-                
-                await self._execute_query(query, (chat_id, new_langs, new_auto, current_time, current_time))
+            await self._write(
+                self._Q_SET_CHANNEL,
+                (chat_id, insert_langs, insert_auto, current_time, current_time, new_langs, new_auto)
+            )
             
+            self.invalidate_channel(chat_id)
             logger.info(f"Channel settings updated for {chat_id}")
             
         except Exception as e:
@@ -310,14 +482,20 @@ class UniversalStorage:
             raise DatabaseError(f"Failed to set channel settings: {e}")
     
     async def get_user_settings(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get user settings, served from the in-process cache when fresh."""
+        cached = self._cache_get(self._user_cache, user_id)
+        if cached is not _MISSING and not await self._cache_is_current():
+            cached = _MISSING
+        if cached is _MISSING:
+            cached = await self._fetch_user_settings(user_id)
+            self._cache_put(self._user_cache, user_id, cached)
+        
+        return dict(cached) if cached is not None else None
+    
+    async def _fetch_user_settings(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user settings."""
         try:
-            if self.db_type == 'postgresql':
-                query = "SELECT target_lang FROM user_settings WHERE user_id = $1"
-            else:
-                query = "SELECT target_lang FROM user_settings WHERE user_id = ?"
-            
-            row = await self._execute_query(query, (user_id,), fetch='one')
+            row = await self._execute_query(self._Q_GET_USER, (user_id,), fetch='one')
             
             if row:
                 return {"target_lang": row[0]}
@@ -331,60 +509,34 @@ class UniversalStorage:
     async def set_user_settings(self, user_id: int, target_lang: str):
         """Set user settings."""
         try:
-            current_time = int(datetime.now().timestamp())
+            current_time = int(time.time())
             
-            # Check if user exists
-            if self.db_type == 'postgresql':
-                query = "SELECT 1 FROM user_settings WHERE user_id = $1"
-            else:
-                query = "SELECT 1 FROM user_settings WHERE user_id = ?"
-            
-            exists = await self._execute_query(query, (user_id,), fetch='one')
-            
-            if exists:
-                # Update existing settings
-                if self.db_type == 'postgresql':
-                    query = "UPDATE user_settings SET target_lang = $1, updated_at = $2 WHERE user_id = $3"
-                else:
-                    query = "UPDATE user_settings SET target_lang = ?, updated_at = ? WHERE user_id = ?"
-                
-                await self._execute_query(query, (target_lang, current_time, user_id))
-            else:
-                # Insert new settings
-                if self.db_type == 'postgresql':
-                    query = """INSERT INTO user_settings 
-                               (user_id, target_lang, created_at, updated_at)
-                               VALUES ($1, $2, $3, $4)"""
-                else:
-                    query = """INSERT INTO user_settings 
-                               (user_id, target_lang, created_at, updated_at)
-                               VALUES (?, ?, ?, ?)"""
-                
-                await self._execute_query(query, (user_id, target_lang, current_time, current_time))
+            await self._write(self._Q_SET_USER, (user_id, target_lang, current_time, current_time))
             
+            self.invalidate_user(user_id)
             logger.info(f"User settings updated for {user_id}")
             
         except Exception as e:
             logger.error(f"Failed to set user settings for {user_id}: {e}")
             raise DatabaseError(f"Failed to set user settings: {e}")
     
+    async def distinct_user_languages(self) -> Set[str]:
+        """Get the set of interface languages chosen by users."""
+        try:
+            rows = await self._execute_query(self._Q_DISTINCT_USER_LANGS, (), fetch='all')
+            return {row[0] for row in rows if row[0]}
+            
+        except Exception as e:
+            logger.error(f"Failed to get distinct user languages: {e}")
+            raise DatabaseError(f"Failed to get distinct user languages: {e}")
+    
     async def add_user_channel(self, user_id: int, channel_id: int, channel_title: str = None):
         """Add user-channel relationship."""
         try:
-            current_time = int(datetime.now().timestamp())
+            current_time = int(time.time())
             
-            if self.db_type == 'postgresql':
-                query = """INSERT INTO user_channels 
-                           (user_id, channel_id, channel_title, added_at)
-                           VALUES ($1, $2, $3, $4)
-                           ON CONFLICT (user_id, channel_id) 
-                           DO UPDATE SET channel_title = $3, added_at = $4"""
-            else:
-                query = """INSERT OR REPLACE INTO user_channels 
-                           (user_id, channel_id, channel_title, added_at)
-                           VALUES (?, ?, ?, ?)"""
-            
-            await self._execute_query(query, (user_id, channel_id, channel_title or f"Channel {channel_id}", current_time))
+            await self._write(self._Q_ADD_USER_CHANNEL, (user_id, channel_id, channel_title or f"Channel {channel_id}", current_time))
+            self.invalidate_channel(channel_id)
             logger.info(f"Added user {user_id} to channel {channel_id}")
             
         except Exception as e:
@@ -393,127 +545,87 @@ class UniversalStorage:
     async def get_user_channels(self, user_id: int) -> List[Dict[str, Any]]:
         """Get channels where user added the bot."""
         try:
-            if self.db_type == 'postgresql':
-                query = """SELECT uc.channel_id, uc.channel_title, uc.added_at,
-                                  cs.target_langs, cs.autotranslate, cs.created_at, cs.updated_at
-                           FROM user_channels uc
-                           LEFT JOIN channel_settings cs ON uc.channel_id = cs.chat_id
-                           WHERE uc.user_id = $1
-                           ORDER BY uc.added_at DESC"""
-            else:
-                query = """SELECT uc.channel_id, uc.channel_title, uc.added_at,
-                                  cs.target_langs, cs.autotranslate, cs.created_at, cs.updated_at
-                           FROM user_channels uc
-                           LEFT JOIN channel_settings cs ON uc.channel_id = cs.chat_id
-                           WHERE uc.user_id = ?
-                           ORDER BY uc.added_at DESC"""
-            
-            rows = await self._execute_query(query, (user_id,), fetch='all')
+            rows = await self._execute_query(self._Q_GET_USER_CHANNELS, (user_id,), fetch='all')
             
-            channels = []
-            for row in rows:
-                autotranslate = row[4] if self.db_type == 'postgresql' else bool(row[4]) if row[4] is not None else True
-                
-                channels.append({
-                    "chat_id": row[0],
-                    "title": row[1] or f"Channel {row[0]}",
-                    "added_at": row[2],
-                    "target_langs": row[3] or "en",
-                    "autotranslate": autotranslate,
-                    "created_at": row[5],
-                    "updated_at": row[6],
-                })
-            
-            return channels
+            # Column aliases and defaults are applied in SQL
+            return [dict(row) for row in rows]
             
         except Exception as e:
             logger.error(f"Failed to get user channels for {user_id}: {e}")
             return []
     
-    async def record_translation_stats(
+    def record_translation_stats(
         self, 
         channel_id: int, 
         posts: int = 0, 
         translations: int = 0
     ) -> None:
-        """Record translation statistics for a channel."""
+        """Record translation statistics for a channel.
+        
+        Counters are buffered in memory and written by flush_stats().
+        """
+        counters = self._stats_buffer[(_today_iso(), channel_id)]
+        counters[0] += posts
+        counters[1] += translations
+    
+    async def flush_stats(self) -> None:
+        """Write buffered translation statistics in a single transaction."""
+        if not self._stats_buffer or self._conn is None:
+            return
+        
+        buffer, self._stats_buffer = self._stats_buffer, defaultdict(lambda: [0, 0])
+        timestamp = int(time.time())
+        rows = [
+            (stats_date, channel_id, posts, translations, timestamp)
+            for (stats_date, channel_id), (posts, translations) in buffer.items()
+        ]
+        
         try:
-            from datetime import date
-            today = date.today().isoformat()
-            timestamp = int(datetime.now().timestamp())
-            
-            if self.db_type == 'postgresql':
-                # Check if record exists for today
-                check_query = """
-                    SELECT id FROM stats 
-                    WHERE date = $1 AND channel_id = $2
-                """
-                existing = await self._execute_query(
-                    check_query, 
-                    (today, channel_id), 
-                    fetch='one'
-                )
-                
-                if existing:
-                    # Update existing record
-                    update_query = """
-                        UPDATE stats 
-                        SET posts = posts + $1, 
-                            translations = translations + $2
-                        WHERE date = $3 AND channel_id = $4
-                    """
-                    await self._execute_query(
-                        update_query, 
-                        (posts, translations, today, channel_id)
-                    )
-                else:
-                    # Insert new record
-                    insert_query = """
-                        INSERT INTO stats (date, channel_id, posts, translations, created_at)
-                        VALUES ($1, $2, $3, $4, $5)
-                    """
-                    await self._execute_query(
-                        insert_query, 
-                        (today, channel_id, posts, translations, timestamp)
-                    )
-            else:
-                # SQLite
-                check_query = """
-                    SELECT id FROM stats 
-                    WHERE date = ? AND channel_id = ?
-                """
-                existing = await self._execute_query(
-                    check_query, 
-                    (today, channel_id), 
-                    fetch='one'
-                )
-                
-                if existing:
-                    # Update existing record
-                    update_query = """
-                        UPDATE stats 
-                        SET posts = posts + ?, 
-                            translations = translations + ?
-                        WHERE date = ? AND channel_id = ?
-                    """
-                    await self._execute_query(
-                        update_query, 
-                        (posts, translations, today, channel_id)
-                    )
-                else:
-                    # Insert new record
-                    insert_query = """
-                        INSERT INTO stats (date, channel_id, posts, translations, created_at)
-                        VALUES (?, ?, ?, ?, ?)
-                    """
-                    await self._execute_query(
-                        insert_query, 
-                        (today, channel_id, posts, translations, timestamp)
-                    )
-            
+            await self._executemany(self._Q_RECORD_STATS, rows)
+        except Exception as e:
+            logger.error(f"Failed to flush translation stats: {e}")
+            # Keep the counters so the next flush retries them; stats are not critical
+            for key, (posts, translations) in buffer.items():
+                counters = self._stats_buffer[key]
+                counters[0] += posts
+                counters[1] += translations
+    
+    async def optimize(self):
+        """Let SQLite refresh query planner statistics where they are stale."""
+        if self._conn is None:
+            return
+        
+        try:
+            async with self._lock:
+                await self._conn.execute("PRAGMA optimize")
         except Exception as e:
-            logger.error(f"Failed to record translation stats: {e}")
-            # Don't raise - stats are not critical
+            logger.warning(f"PRAGMA optimize failed: {e}")
+    
+    def _start_optimize_task(self):
+        """Start periodic PRAGMA optimize task."""
+        if self._optimize_task is not None:
+            return
+        
+        async def optimize_loop():
+            while True:
+                await asyncio.sleep(OPTIMIZE_INTERVAL)
+                await self.optimize()
+        
+        self._optimize_task = asyncio.create_task(optimize_loop())
+    
+    def _start_stats_flush_task(self):
+        """Start periodic stats flush task."""
+        if self._stats_task is not None:
+            return
+        
+        async def flush_loop():
+            while True:
+                await asyncio.sleep(STATS_FLUSH_INTERVAL)
+                # Cancelling the loop must not abort a flush halfway: its
+                # counters are already out of the buffer
+                await asyncio.shield(self.flush_stats())
+        
+        self._stats_task = asyncio.create_task(flush_loop())
     
     async def get_translation_stats(
         self, 
@@ -522,39 +634,17 @@ class UniversalStorage:
     ) -> Dict[str, int]:
         """Get translation statistics for a channel."""
         try:
-            from datetime import date, timedelta
             end_date = date.today()
             start_date = end_date - timedelta(days=days-1)
             
-            if self.db_type == 'postgresql':
-                query = """
-                    SELECT SUM(posts) as total_posts, 
-                           SUM(translations) as total_translations
-                    FROM stats
-                    WHERE channel_id = $1 
-                    AND date >= $2 
-                    AND date <= $3
-                """
-                result = await self._execute_query(
-                    query, 
-                    (channel_id, start_date.isoformat(), end_date.isoformat()),
-                    fetch='one'
-                )
-            else:
-                # SQLite
-                query = """
-                    SELECT SUM(posts) as total_posts, 
-                           SUM(translations) as total_translations
-                    FROM stats
-                    WHERE channel_id = ? 
-                    AND date >= ? 
-                    AND date <= ?
-                """
-                result = await self._execute_query(
-                    query, 
-                    (channel_id, start_date.isoformat(), end_date.isoformat()),
-                    fetch='one'
-                )
+            # Include counters that have not been flushed yet
+            await self.flush_stats()
+            
+            result = await self._execute_query(
+                self._Q_GET_STATS, 
+                (channel_id, start_date.isoformat(), end_date.isoformat()),
+                fetch='one'
+            )
             
             if result and result[0] is not None:
                 return {
@@ -568,15 +658,20 @@ class UniversalStorage:
             logger.error(f"Failed to get translation stats: {e}")
             return {"posts": 0, "translations": 0}
     
-    async def health_check(self) -> bool:
-        """Check database health."""
+    async def health_check(self, deep: bool = False) -> bool:
+        """Check database health.
+        
+        The default check is local: the connection is open and its worker thread
+        is alive. Pass deep=True to also round-trip a statement through SQLite.
+        """
+        if self._conn is None or not self._conn.is_alive():
+            return False
+        
+        if not deep:
+            return True
+        
         try:
-            if self.db_type == 'postgresql':
-                query = "SELECT 1"
-            else:
-                query = "SELECT 1"
-            
-            await self._execute_query(query, (), fetch='one')
+            await self._execute_query(self._Q_HEALTH, (), fetch='one')
             return True
             
         except Exception as e:
@@ -584,35 +679,57 @@ class UniversalStorage:
             return False
     
     async def close(self):
-        """Close database connections."""
-        if self.db_type == 'postgresql' and self._pool:
-            await self._pool.close()
+        """Close the database connection."""
+        if self._conn is not None:
+            # Let a flush or optimize in progress unwind before the final flush
+            for task in (self._stats_task, self._optimize_task):
+                if task is not None:
+                    task.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await task
+            self._stats_task = None
+            self._optimize_task = None
+            await self.flush_stats()
+            await self.optimize()
+            await self._conn.close()
+            self._conn = None
+            self._initialized = False
+
+
+@lru_cache(maxsize=None)
+def get_storage() -> UniversalStorage:
+    """Get the shared storage instance, creating it on first use."""
+    return UniversalStorage()
 
 
-# Global storage instance
-storage = UniversalStorage()
+def __getattr__(name: str) -> Any:
+    """Lazily resolve the module-level `storage` instance."""
+    if name == "storage":
+        return get_storage()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 async def init_storage():
     """Initialize storage on startup."""
-    await storage.initialize()
+    await get_storage().initialize()
 
 
 # Utility functions for common operations
 async def get_channel_target_languages(chat_id: int) -> List[str]:
     """Get target languages for a channel."""
-    settings_data = await storage.get_channel_settings(chat_id)
+    settings_data = await get_storage().get_channel_settings(chat_id)
     return settings_data["target_langs"]
 
 
 async def is_autotranslate_enabled(chat_id: int) -> bool:
     """Check if auto-translation is enabled for a channel."""
-    settings_data = await storage.get_channel_settings(chat_id)
-    return settings_data["autotranslate"]
+    settings_data = await get_storage().get_channel_settings(chat_id)
+    return bool(settings_data["autotranslate"])
 
 
 async def get_user_target_language(user_id: int) -> str:
     """Get target language for a user."""
-    settings_data = await storage.get_user_settings(user_id)
+    settings = get_settings()
+    settings_data = await get_storage().get_user_settings(user_id)
     return settings_data.get("target_lang", settings.default_user_lang) if settings_data else settings.default_user_lang
 
@@ -1,15 +1,19 @@
 """Internationalization and language detection utilities."""
 
+import json
 import re
-from typing import Dict, List, Optional, Tuple
-from enum import Enum
+from collections.abc import Mapping
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from .logger import get_logger
 
 logger = get_logger(__name__)
 
 
-class SupportedLanguage(str, Enum):
+class SupportedLanguage:
     """Supported language codes (ISO 639-1)."""
     
     ENGLISH = "en"
@@ -30,6 +34,17 @@ class SupportedLanguage(str, Enum):
     UKRAINIAN = "uk"
 
 
+# Supported codes in declaration order
+SUPPORTED_LANGUAGES: Tuple[str, ...] = (
+    "en", "ru", "tr", "es", "fr", "de", "it", "pt",
+    "zh", "ja", "ko", "ar", "hi", "nl", "pl", "uk",
+)
+
+# Membership check that also maps any equal string to the interned
+# constant, so normalized codes compare by identity in later dict lookups
+_CANONICAL_CODES: Dict[str, str] = {code: code for code in SUPPORTED_LANGUAGES}
+
+
 # Language name mappings
 LANGUAGE_NAMES = {
     "en": {"en": "English", "ru": "Английский"},
@@ -49,257 +64,94 @@ LANGUAGE_NAMES = {
     "pl": {"en": "Polish", "ru": "Польский"},
     "uk": {"en": "Ukrainian", "ru": "Украинский"},
 }
+LANGUAGE_NAMES = MappingProxyType({code: MappingProxyType(names) for code, names in LANGUAGE_NAMES.items()})
 
-# Localized strings
-STRINGS = {
-    "en": {
-        "start_message": "🐟 **Hello! Welcome to Translation Bot!**\n\nThis bot automatically translates posts in your channel's discussion group (comments section).\n\n📋 **How to get started:**\n1️⃣ Add the bot to your channel's discussion group using the button below\n2️⃣ Make sure your channel has a discussion group enabled\n3️⃣ The bot will automatically translate all posts in comments\n\n🤖 **How it works:**\n• Bot translates channel posts automatically in comments\n• Supports 134+ languages\n• Works only in discussion groups (comments section)\n\n💡 **Tip:** If your channel doesn't have a discussion group, create one in channel settings first!",
-        "main_menu": "🏠 **Main Menu**\n\nChoose an option:",
-        "interface_language": "🌐 Interface Language",
-        "translation_language": "🔄 Translation Language", 
-        "my_channels": "💬 My Channel Chats",
-        "setup_guide": "📋 Setup Guide",
-        "help_menu": "❓ Help",
-        "language_selection": "🌐 **Choose Interface Language**\n\nSelect your preferred language for bot messages:",
-        "translation_lang_explanation": "🔄 **Translation Language Settings**\n\nThis setting determines which language the bot will translate posts and messages TO in your channels.\n\nExample: If you set Russian, all posts will be translated to Russian in comments.",
-        "no_channels_connected": "💬 **My Channel Chats**\n\n❌ No channel chats connected yet.\n\nTo connect a channel chat:\n1. Add bot to your channel's discussion group (chat)\n2. Make sure your channel has a discussion group enabled\n3. Your channel chats will appear here",
-        "channel_setup_success": "✅ **Channel Setup Complete!**\n\nYour channel is now connected and ready to translate posts automatically!\n\n🎯 **What happens next:**\n• Post anything in your channel\n• Bot will automatically add translations in comments\n• Users can also request translations by mentioning the bot",
-        "channel_no_discussion": "⚠️ **Discussion Group Required**\n\nYour channel needs a discussion group for the bot to add translation comments.\n\n📋 **How to enable:**\n1. Go to your channel settings\n2. Tap 'Discussion'\n3. Create or link a group\n4. Come back and try again",
-        "check_discussion_again": "🔄 Check Again",
-        "how_enable_discussion": "📋 How to Enable Discussion",
-        "discussion_instructions": "📋 **How to Enable Channel Discussion**\n\n**Step 1:** Open your channel\n**Step 2:** Tap the channel name at the top\n**Step 3:** Tap 'Edit'\n**Step 4:** Scroll down and tap 'Discussion'\n**Step 5:** Choose 'Create Group' or link existing group\n**Step 6:** Tap 'Create' or 'Link'\n\n✅ Done! Now posts will have comment sections.",
-        "channel_welcome": "🎉 **Bot Successfully Added!**\n\nNow let's set up automatic translation for your channel posts.\n\n**Select translation languages:**\nChoose which languages you want posts to be translated to in comments.",
-        "help_message": """🌐 **Translation Bot Help**
-
-**In Private Chat:**
-• Send any text - get translation
-• /set_my_lang <code> - set your preferred language
-• /privacy - privacy policy
-• /provider - current translation provider
-
-**In Channel Comments:**
-• Reply to my comment or mention me @{username}
-• I'll translate your message
-
-**Admin Commands (in channels):**
-• /set_channel_langs <list> - set target languages (e.g., en,ru,tr)
-• /toggle_autotranslate on|off - enable/disable auto-translation
-• /stats - translation statistics
-
-**Supported Languages:**
-{languages}
-
-**Examples:**
-• "Hello world" → "Привет мир" (if target is Russian)
-• "переведи на en: Привет" → "Hello"
-""",
-        "language_set": "✅ Your language has been set to: {language}",
-        "invalid_language": "❌ Invalid language code. Supported: {languages}",
-        "channel_langs_set": "✅ Channel target languages set to: {languages}",
-        "autotranslate_enabled": "✅ Auto-translation enabled for this channel",
-        "autotranslate_disabled": "❌ Auto-translation disabled for this channel",
-        "admin_only": "⚠️ This command is only available to channel administrators",
-        "rate_limit": "⏰ Please wait a moment before sending another request",
-        "translation_error": "❌ Translation failed. Please try again later",
-        "no_text": "❌ No text to translate",
-        "same_language": "ℹ️ Text is already in the target language",
-        "privacy_message": """🔒 **Privacy Policy**
-
-**What we log:**
-• Translation requests (without personal data)
-• Error messages and system events
-• Usage statistics (anonymized)
-
-**What we DON'T log:**
-• Your personal messages content
-• User IDs or usernames
-• API keys or tokens
-
-**Data storage:**
-• Language preferences (can be deleted with /reset)
-• Channel settings (admin-controlled)
-
-**To delete your data:**
-Contact the bot administrator.
-""",
-        "provider_info": "🔧 Current translation provider: {provider}",
-        "stats_message": """📊 **Translation Statistics**
-
-**Last 24 hours:**
-• Posts translated: {posts_24h}
-• Total translations: {translations_24h}
-
-**Last 7 days:**
-• Posts translated: {posts_7d}
-• Total translations: {translations_7d}
-""",
-        "comments_disabled": "⚠️ Comments are disabled for this channel. Enable discussions to use auto-translation.",
-        "bot_not_admin": "⚠️ I need to be an administrator in this channel to post comments.",
-        "translation_header": "🌐 Translation ({source}→{target}):",
-        "translation_edited": "🌐 Translation ({source}→{target}) (edited):",
-        "add_to_group": "➕ Add to Channel Chat",
-        "setup_instructions": """📋 **Setup Instructions**
-
-**Step 1: Add bot to your channel**
-1. Go to your channel settings
-2. Click "Administrators" 
-3. Click "Add Administrator"
-4. Search for @{username}
-5. Add the bot
-
-**Step 2: Set bot permissions (SAFE)**
-✅ **Enable only:**
-• Administrator rights (basic level)
-
-❌ **DISABLE all other permissions:**
-• Change description
-• Delete messages
-• Ban users
-• Invite links
-• Pin messages
-• Manage video chats
-• Anonymous mode
-
-**Step 3: Enable Discussions**
-1. Go to channel settings
-2. Enable "Discussion Group"
-3. This allows comments on posts
-
-**Step 4: Configure languages**
-Send this command in your channel:
-`/set_channel_langs en,ru`
-
-**Step 5: Test it!**
-Post any message in your channel - bot will automatically add translation in comments!
-
-🔒 **Security**: Bot only needs minimal permissions to work safely.""",
-        "supported_languages": "🌐 **Supported Languages**: English, Russian, Turkish, Spanish, French, German, Italian, Portuguese, Chinese, Japanese, Korean, Arabic, Hindi, Dutch, Polish, Ukrainian and 120+ more languages!\n\n🛡️ **Security Note**: This bot is designed with privacy and security in mind. It only requires minimal permissions and never stores your messages.",
-    },
-    "ru": {
-        "start_message": "🐟 **Привет! Добро пожаловать в бот-переводчик!**\n\nЭтот бот автоматически переводит посты в группе обсуждений вашего канала (секция комментариев).\n\n📋 **Как начать:**\n1️⃣ Добавьте бота в группу обсуждений вашего канала, используя кнопку ниже\n2️⃣ Убедитесь, что у вашего канала включена группа обсуждений\n3️⃣ Бот будет автоматически переводить все посты в комментариях\n\n🤖 **Как работает:**\n• Бот переводит посты канала автоматически в комментариях\n• Поддерживает 134+ языков\n• Работает только в группах обсуждений (секция комментариев)\n\n💡 **Совет:** Если у вашего канала нет группы обсуждений, сначала создайте её в настройках канала!",
-        "main_menu": "🏠 **Главное меню**\n\nВыберите опцию:",
-        "interface_language": "🌐 Язык интерфейса",
-        "translation_language": "🔄 Язык перевода",
-        "my_channels": "💬 Мои чаты каналов", 
-        "setup_guide": "📋 Инструкция",
-        "help_menu": "❓ Помощь",
-        "language_selection": "🌐 **Выбор языка интерфейса**\n\nВыберите предпочитаемый язык для сообщений бота:",
-        "translation_lang_explanation": "🔄 **Настройки языка перевода**\n\nЭта настройка определяет, НА КАКОЙ язык бот будет переводить посты и сообщения в ваших каналах.\n\nПример: Если выберете русский, все посты будут переводиться на русский в комментариях.",
-        "no_channels_connected": "💬 **Мои чаты каналов**\n\n❌ Чаты каналов пока не подключены.\n\nЧтобы подключить чат канала:\n1. Добавьте бота в группу обсуждений вашего канала (чат)\n2. Убедитесь, что у вашего канала включена группа обсуждений\n3. Ваши чаты каналов появятся здесь",
-        "channel_setup_success": "✅ **Настройка канала завершена!**\n\nВаш канал подключен и готов автоматически переводить посты!\n\n🎯 **Что происходит дальше:**\n• Опубликуйте любой пост в канале\n• Бот автоматически добавит переводы в комментариях\n• Пользователи также могут запросить перевод, упомянув бота",
-        "channel_no_discussion": "⚠️ **Нужна группа обсуждений**\n\nВашему каналу нужна группа обсуждений, чтобы бот мог добавлять переводы в комментариях.\n\n📋 **Как включить:**\n1. Зайдите в настройки канала\n2. Нажмите 'Обсуждение'\n3. Создайте или привяжите группу\n4. Вернитесь и попробуйте снова",
-        "check_discussion_again": "🔄 Проверить снова",
-        "how_enable_discussion": "📋 Как включить обсуждения",
-        "discussion_instructions": "📋 **Как включить обсуждения канала**\n\n**Шаг 1:** Откройте ваш канал\n**Шаг 2:** Нажмите на название канала вверху\n**Шаг 3:** Нажмите 'Изменить'\n**Шаг 4:** Прокрутите вниз и нажмите 'Обсуждение'\n**Шаг 5:** Выберите 'Создать группу' или привяжите существующую\n**Шаг 6:** Нажмите 'Создать' или 'Привязать'\n\n✅ Готово! Теперь у постов будут комментарии.",
-        "channel_welcome": "🎉 **Бот успешно добавлен!**\n\nТеперь настроим автоматический перевод постов вашего канала.\n\n**Выберите языки перевода:**\nВыберите на какие языки переводить посты в комментариях.",
-        "help_message": """🌐 **Помощь по боту-переводчику**
-
-**В личных сообщениях:**
-• Отправь любой текст - получи перевод
-• /set_my_lang <код> - установить предпочитаемый язык
-• /privacy - политика конфиденциальности
-• /provider - текущий провайдер переводов
-
-**В комментариях канала:**
-• Ответь на мой комментарий или упомяни меня @{username}
-• Я переведу твое сообщение
-
-**Команды администратора (в каналах):**
-• /set_channel_langs <список> - установить целевые языки (например, en,ru,tr)
-• /toggle_autotranslate on|off - включить/выключить автоперевод
-• /stats - статистика переводов
-
-**Поддерживаемые языки:**
-{languages}
-
-**Примеры:**
-• "Hello world" → "Привет мир" (если цель - русский)
-• "переведи на en: Привет" → "Hello"
-""",
-        "language_set": "✅ Ваш язык установлен на: {language}",
-        "invalid_language": "❌ Неверный код языка. Поддерживаются: {languages}",
-        "channel_langs_set": "✅ Целевые языки канала установлены на: {languages}",
-        "autotranslate_enabled": "✅ Автоперевод включен для этого канала",
-        "autotranslate_disabled": "❌ Автоперевод выключен для этого канала",
-        "admin_only": "⚠️ Эта команда доступна только администраторам канала",
-        "rate_limit": "⏰ Пожалуйста, подождите немного перед отправкой следующего запроса",
-        "translation_error": "❌ Ошибка перевода. Попробуйте позже",
-        "no_text": "❌ Нет текста для перевода",
-        "same_language": "ℹ️ Текст уже на целевом языке",
-        "privacy_message": """🔒 **Политика конфиденциальности**
-
-**Что мы логируем:**
-• Запросы на перевод (без персональных данных)
-• Сообщения об ошибках и системные события
-• Статистику использования (анонимизированную)
-
-**Что мы НЕ логируем:**
-• Содержимое ваших личных сообщений
-• ID пользователей или имена пользователей
-• API ключи или токены
-
-**Хранение данных:**
-• Языковые предпочтения (можно удалить через /reset)
-• Настройки канала (контролируются администратором)
-
-**Для удаления ваших данных:**
-Обратитесь к администратору бота.
-""",
-        "provider_info": "🔧 Текущий провайдер переводов: {provider}",
-        "stats_message": """📊 **Статистика переводов**
-
-**За последние 24 часа:**
-• Переведено постов: {posts_24h}
-• Всего переводов: {translations_24h}
-
-**За последние 7 дней:**
-• Переведено постов: {posts_7d}
-• Всего переводов: {translations_7d}
-""",
-        "comments_disabled": "⚠️ Комментарии отключены для этого канала. Включите обсуждения для использования автоперевода.",
-        "bot_not_admin": "⚠️ Мне нужны права администратора в этом канале для публикации комментариев.",
-        "translation_header": "🌐 Перевод ({source}→{target}):",
-        "translation_edited": "🌐 Перевод ({source}→{target}) (отредактировано):",
-        "add_to_group": "➕ Добавить в чат канала",
-        "setup_instructions": """📋 **Инструкция по настройке**
-
-**Шаг 1: Добавьте бота в канал**
-1. Зайдите в настройки канала
-2. Нажмите "Администраторы"
-3. Нажмите "Добавить администратора"
-4. Найдите @{username}
-5. Добавьте бота
-
-**Шаг 2: Установите права бота (БЕЗОПАСНО)**
-✅ **Включите только:**
-• Права администратора (базовый уровень)
-
-❌ **ВЫКЛЮЧИТЕ все остальные права:**
-• Изменение описания
-• Удаление сообщений
-• Блокировка пользователей
-• Пригласительные ссылки
-• Закрепление сообщений
-• Управление видеочатами
-• Анонимность
-
-**Шаг 3: Включите обсуждения**
-1. Зайдите в настройки канала
-2. Включите "Группа обсуждений"
-3. Это позволит комментировать посты
-
-**Шаг 4: Настройте языки**
-Отправьте эту команду в канале:
-`/set_channel_langs en,ru`
-
-**Шаг 5: Протестируйте!**
-Опубликуйте любое сообщение в канале - бот автоматически добавит перевод в комментариях!
-
-🔒 **Безопасность**: Боту нужны только минимальные права для безопасной работы.""",
-        "supported_languages": "🌐 **Поддерживаемые языки**: Английский, Русский, Турецкий, Испанский, Французский, Немецкий, Итальянский, Португальский, Китайский, Японский, Корейский, Арабский, Хинди, Голландский, Польский, Украинский и 120+ других языков!\n\n🛡️ **Примечание о безопасности**: Этот бот разработан с учетом приватности и безопасности. Ему нужны только минимальные права, и он никогда не сохраняет ваши сообщения.",
-    }
+# (code, display language) -> name, for one-hop lookups
+_LANGUAGE_NAMES_FLAT: Dict[Tuple[str, str], str] = {
+    (code, display_lang): name
+    for code, names in LANGUAGE_NAMES.items()
+    for display_lang, name in names.items()
 }
 
+# "code - name" listings of supported languages per display language
+_SUPPORTED_LANGUAGES_LISTS = {
+    display_lang: "\n".join(
+        f"{code} - {LANGUAGE_NAMES[code][display_lang]}" for code in SUPPORTED_LANGUAGES
+    )
+    for display_lang in ("en", "ru")
+}
+
+# Localized strings, one JSON file per locale, loaded on first use
+LOCALES_DIR = Path(__file__).parent / "locales"
+
+
+class _LazyLocales(Mapping):
+    """Locale string tables keyed by language code, read from disk on first access.
+    
+    Indexing, get(), `in` and iteration all see every locale file, loaded or not.
+    """
+    
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.available = frozenset(path.stem for path in directory.glob("*.json"))
+        self._loaded: Dict[str, Dict[str, str]] = {}
+    
+    def __getitem__(self, lang: str) -> Dict[str, str]:
+        strings = self._loaded.get(lang)
+        if strings is None:
+            if lang not in self.available:
+                raise KeyError(lang)
+            with open(self.directory / f"{lang}.json", encoding="utf-8") as f:
+                strings = self._loaded[lang] = json.load(f)
+        return strings
+    
+    def __contains__(self, lang: object) -> bool:
+        return lang in self.available
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted(self.available))
+    
+    def __len__(self) -> int:
+        return len(self.available)
+
+
+STRINGS = _LazyLocales(LOCALES_DIR)
+
+
+# Precompiled detection patterns
+_CYRILLIC_RE = re.compile(r'[а-яё]')
+_TURKISH_RE = re.compile(r'[çğıöşü]')
+_ARABIC_RE = re.compile(r'[\u0600-\u06FF]')
+_CJK_ZH_RE = re.compile(r'[\u4e00-\u9fff]')
+_JP_KANA_RE = re.compile(r'[\u3040-\u309f\u30a0-\u30ff]')
+_DE_WORDS_RE = re.compile(r'\b(der|die|das|und|ist|ein|eine)\b')
+_FR_WORDS_RE = re.compile(r'\b(le|la|les|et|est|un|une|de|du)\b')
+_ES_WORDS_RE = re.compile(r'\b(el|la|los|las|y|es|un|una|de|del)\b')
+_IT_WORDS_RE = re.compile(r'\b(il|la|lo|gli|le|e|è|un|una|di|del)\b')
+_WORD_PATTERNS = (
+    ("de", _DE_WORDS_RE),
+    ("fr", _FR_WORDS_RE),
+    ("es", _ES_WORDS_RE),
+    ("it", _IT_WORDS_RE),
+)
+
+# Per-codepoint script buckets (BMP only) used by detect_text_language
+_SCRIPT_LANGS = (None, "ru", "tr", "ar", "zh", "ja")
+_SCRIPT_BUCKET = bytearray(0x10000)
+_SCRIPT_BUCKET[0x0430:0x0450] = b"\x01" * 0x20  # а-я
+_SCRIPT_BUCKET[0x0451] = 1  # ё
+for _ch in "çğıöşü":
+    _SCRIPT_BUCKET[ord(_ch)] = 2
+_SCRIPT_BUCKET[0x0600:0x0700] = b"\x03" * 0x100
+_SCRIPT_BUCKET[0x4E00:0xA000] = b"\x04" * 0x5200
+_SCRIPT_BUCKET[0x3040:0x3100] = b"\x05" * 0xC0
+del _ch
+
+# Detection results are memoized for texts up to this length; longer
+# texts are classified directly so the cache stays small
+DETECT_CACHE_SIZE = 4096
+DETECT_CACHE_MAX_LEN = 512
+
 
 def detect_user_language(text: str, user_id: Optional[int] = None) -> str:
     """Detect user's preferred language from text or user settings."""
@@ -308,24 +160,32 @@ def detect_user_language(text: str, user_id: Optional[int] = None) -> str:
     if not text:
         return "en"
     
+    if len(text) <= DETECT_CACHE_MAX_LEN:
+        return _detect_user_language_cached(text)
+    return _detect_user_language(text)
+
+
+def _detect_user_language(text: str) -> str:
+    """Classify non-empty text by the first distinctive script it contains."""
+    
     # Check for Cyrillic characters (Russian/Ukrainian)
-    if re.search(r'[а-яё]', text.lower()):
+    if _CYRILLIC_RE.search(text.lower()):
         return "ru"
     
     # Check for specific Turkish characters
-    if re.search(r'[çğıöşü]', text.lower()):
+    if _TURKISH_RE.search(text.lower()):
         return "tr"
     
     # Check for Arabic script
-    if re.search(r'[\u0600-\u06FF]', text):
+    if _ARABIC_RE.search(text):
         return "ar"
     
     # Check for Chinese characters
-    if re.search(r'[\u4e00-\u9fff]', text):
+    if _CJK_ZH_RE.search(text):
         return "zh"
     
     # Check for Japanese characters
-    if re.search(r'[\u3040-\u309f\u30a0-\u30ff]', text):
+    if _JP_KANA_RE.search(text):
         return "ja"
     
     # Default to English
@@ -338,58 +198,49 @@ def detect_text_language(text: str) -> str:
     if not text or len(text.strip()) < 3:
         return "en"
     
-    text_lower = text.lower()
-    
-    # Count language-specific characters
-    scores = {}
-    
-    # Cyrillic (Russian/Ukrainian)
-    cyrillic_count = len(re.findall(r'[а-яё]', text_lower))
-    if cyrillic_count > 0:
-        scores["ru"] = cyrillic_count / len(text)
-    
-    # Turkish specific characters
-    turkish_count = len(re.findall(r'[çğıöşü]', text_lower))
-    if turkish_count > 0:
-        scores["tr"] = turkish_count / len(text)
-    
-    # Arabic script
-    arabic_count = len(re.findall(r'[\u0600-\u06FF]', text))
-    if arabic_count > 0:
-        scores["ar"] = arabic_count / len(text)
-    
-    # Chinese characters
-    chinese_count = len(re.findall(r'[\u4e00-\u9fff]', text))
-    if chinese_count > 0:
-        scores["zh"] = chinese_count / len(text)
-    
-    # Japanese characters
-    japanese_count = len(re.findall(r'[\u3040-\u309f\u30a0-\u30ff]', text))
-    if japanese_count > 0:
-        scores["ja"] = japanese_count / len(text)
-    
-    # German specific patterns
-    if re.search(r'\b(der|die|das|und|ist|ein|eine)\b', text_lower):
-        scores["de"] = scores.get("de", 0) + 0.1
+    if len(text) <= DETECT_CACHE_MAX_LEN:
+        return _detect_text_language_cached(text)
+    return _detect_text_language(text)
+
+
+def _detect_text_language(text: str) -> str:
+    """Score scripts and common words in text and return the best match."""
     
-    # French specific patterns
-    if re.search(r'\b(le|la|les|et|est|un|une|de|du)\b', text_lower):
-        scores["fr"] = scores.get("fr", 0) + 0.1
+    text_lower = text.lower()
     
-    # Spanish specific patterns
-    if re.search(r'\b(el|la|los|las|y|es|un|una|de|del)\b', text_lower):
-        scores["es"] = scores.get("es", 0) + 0.1
+    # Count language-specific characters in a single pass
+    counts = [0] * len(_SCRIPT_LANGS)
+    for ch in text_lower:
+        code = ord(ch)
+        if code < 0x10000:
+            counts[_SCRIPT_BUCKET[code]] += 1
     
-    # Italian specific patterns
-    if re.search(r'\b(il|la|lo|gli|le|e|è|un|una|di|del)\b', text_lower):
-        scores["it"] = scores.get("it", 0) + 0.1
+    # Scores are scaled by 10 * len(text) to stay integral: each script
+    # character is worth 10 and a common-word match is worth len(text).
+    # Strict comparisons keep the earliest language on ties.
+    best_lang, best_score = "en", 0
+    for bucket, lang in enumerate(_SCRIPT_LANGS):
+        if lang and counts[bucket] * 10 > best_score:
+            best_lang, best_score = lang, counts[bucket] * 10
     
-    # Return language with highest score
-    if scores:
-        return max(scores.items(), key=lambda x: x[1])[0]
+    # Common-word patterns share one score, so stop at the first match
+    word_score = len(text)
+    if word_score > best_score:
+        for lang, pattern in _WORD_PATTERNS:
+            if pattern.search(text_lower):
+                return lang
     
-    # Default to English
-    return "en"
+    return best_lang
+
+
+_detect_user_language_cached = lru_cache(maxsize=DETECT_CACHE_SIZE)(_detect_user_language)
+_detect_text_language_cached = lru_cache(maxsize=DETECT_CACHE_SIZE)(_detect_text_language)
+
+
+def clear_detection_cache():
+    """Drop memoized language detection results."""
+    _detect_user_language_cached.cache_clear()
+    _detect_text_language_cached.cache_clear()
 
 
 def normalize_language_code(lang_code: str) -> Optional[str]:
@@ -401,13 +252,8 @@ def normalize_language_code(lang_code: str) -> Optional[str]:
     # Convert to lowercase and take first 2 characters
     normalized = lang_code.lower().strip()[:2]
     
-    # Check if it's a supported language
-    supported_codes = [lang.value for lang in SupportedLanguage]
-    
-    if normalized in supported_codes:
-        return normalized
-    
-    return None
+    # Check if it's a supported language and return its canonical object
+    return _CANONICAL_CODES.get(normalized)
 
 
 def parse_language_list(lang_string: str) -> List[str]:
@@ -416,61 +262,92 @@ def parse_language_list(lang_string: str) -> List[str]:
     if not lang_string:
         return []
     
-    languages = []
-    for lang in lang_string.split(","):
-        normalized = normalize_language_code(lang.strip())
-        if normalized and normalized not in languages:
-            languages.append(normalized)
+    # Normalize each entry inline; dict keys de-duplicate in insertion order
+    languages = dict.fromkeys(
+        _CANONICAL_CODES.get(lang.lower().strip()[:2]) for lang in lang_string.split(",")
+    )
+    languages.pop(None, None)
     
-    return languages
+    return list(languages)
 
 
 def get_language_name(lang_code: str, display_lang: str = "en") -> str:
     """Get human-readable language name."""
     
-    if lang_code in LANGUAGE_NAMES and display_lang in LANGUAGE_NAMES[lang_code]:
-        return LANGUAGE_NAMES[lang_code][display_lang]
+    # Fall back to the English name, then to the bare code
+    return (
+        _LANGUAGE_NAMES_FLAT.get((lang_code, display_lang))
+        or _LANGUAGE_NAMES_FLAT.get((lang_code, "en"))
+        or lang_code.upper()
+    )
+
+
+def _format_localized(key: str, text: str, kwargs: Dict[str, Any]) -> str:
+    """Fill placeholders in a localized string, leaving it as is on a missing argument."""
+    
+    # Static strings are returned as is
+    if "{" not in text:
+        return text
     
-    return lang_code.upper()
+    # Format with provided arguments; format_map reuses the kwargs dict as is
+    try:
+        return text.format_map(kwargs)
+    except KeyError as e:
+        logger.warning(f"Missing format argument {e} for string {key}")
+        return text
 
 
 def get_localized_string(key: str, lang: str = "en", **kwargs) -> str:
     """Get localized string with formatting."""
     
-    # Fallback to English if language not supported
-    if lang not in STRINGS:
-        lang = "en"
+    # Fallback to English if language or key not supported
+    text = STRINGS[lang].get(key) if lang in STRINGS else None
+    if text is None:
+        text = STRINGS["en"].get(key)
+        if text is None:
+            return f"Missing string: {key}"
     
-    # Get string from dictionary
-    if key not in STRINGS[lang]:
-        # Fallback to English
-        if key in STRINGS["en"]:
-            text = STRINGS["en"][key]
+    return _format_localized(key, text, kwargs)
+
+
+def get_localized_strings(keys: Iterable[str], lang: str = "en", **kwargs) -> Dict[str, str]:
+    """Get several localized strings in one language, keyed by string key."""
+    
+    fallback = STRINGS["en"]
+    strings = STRINGS.get(lang, fallback)
+    
+    result = {}
+    for key in keys:
+        text = strings.get(key)
+        if text is None:
+            text = fallback.get(key)
+        if text is None:
+            result[key] = f"Missing string: {key}"
         else:
-            return f"Missing string: {key}"
-    else:
-        text = STRINGS[lang][key]
+            result[key] = _format_localized(key, text, kwargs)
     
-    # Format with provided arguments
-    try:
-        return text.format(**kwargs)
-    except KeyError as e:
-        logger.warning(f"Missing format argument {e} for string {key}")
-        return text
+    return result
+
+
+# Patterns to match language extraction, tried in order
+_EXTRACT_LANG_PATTERNS = (
+    re.compile(r'(?:переведи на|translate to|на)\s+([a-z]{2})\s*[:：]\s*(.+)'),
+    re.compile(r'(?:to|на)\s+([a-z]{2})\s*[:：]\s*(.+)'),
+    re.compile(r'^([a-z]{2})\s*[:：]\s*(.+)'),
+)
 
 
 def extract_language_from_text(text: str) -> Tuple[Optional[str], str]:
     """Extract language code from text like 'переведи на en: текст'."""
     
-    # Patterns to match language extraction
-    patterns = [
-        r'(?:переведи на|translate to|на)\s+([a-z]{2})\s*[:：]\s*(.+)',
-        r'(?:to|на)\s+([a-z]{2})\s*[:：]\s*(.+)',
-        r'^([a-z]{2})\s*[:：]\s*(.+)',
-    ]
+    text_lower = text.lower().strip()
+    
+    # Every pattern needs a colon; most messages have none
+    if ":" not in text_lower and "：" not in text_lower:
+        return None, text
     
-    for pattern in patterns:
-        match = re.search(pattern, text.lower().strip())
+    for pattern in _EXTRACT_LANG_PATTERNS:
+        match = pattern.search(text_lower)
         if match:
             lang_code = normalize_language_code(match.group(1))
             remaining_text = match.group(2).strip()
@@ -483,10 +360,5 @@ def extract_language_from_text(text: str) -> Tuple[Optional[str], str]:
 def get_supported_languages_list(display_lang: str = "en") -> str:
     """Get formatted list of supported languages."""
     
-    languages = []
-    for lang_code in [lang.value for lang in SupportedLanguage]:
-        name = get_language_name(lang_code, display_lang)
-        languages.append(f"{lang_code} - {name}")
-    
-    return "\n".join(languages)
+    return _SUPPORTED_LANGUAGES_LISTS.get(display_lang, _SUPPORTED_LANGUAGES_LISTS["en"])
 
@@ -1,41 +1,66 @@
 """Secure logging configuration without PII leaks."""
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import re
 import sys
+from functools import lru_cache
 from typing import Any, Dict, Optional
 from pathlib import Path
 
-from .config import settings
+from .config import get_settings
 
 
 class PIISafeFormatter(logging.Formatter):
     """Custom formatter that removes PII from log messages."""
     
-    # Patterns to redact sensitive information
+    # Patterns to redact sensitive information, keyed by replacement label.
+    # Combined into one alternation; earlier entries win at the same position.
     REDACT_PATTERNS = [
-        (re.compile(r'\b\d{10}:\w{35}\b'), '[BOT_TOKEN]'),  # Bot token pattern
-        (re.compile(r'\b[A-Za-z0-9]{32,}\b'), '[API_KEY]'),  # API keys
-        (re.compile(r'\b\d{8,12}\b'), '[USER_ID]'),  # User IDs
-        (re.compile(r'@\w+'), '[USERNAME]'),  # Usernames
-        (re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'), '[EMAIL]'),  # Emails
-        (re.compile(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b'), '[IP]'),  # IP addresses
+        ('BOT_TOKEN', r'\b\d{10}:\w{35}\b'),  # Bot token pattern
+        ('API_KEY', r'\b[A-Za-z0-9]{32,}\b'),  # API keys
+        ('USER_ID', r'\b\d{8,12}\b'),  # User IDs
+        ('USERNAME', r'@\w+'),  # Usernames
+        ('EMAIL', r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b'),  # Emails
+        ('IP', r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b'),  # IP addresses
     ]
+    REDACT_RE = re.compile('|'.join(f'(?P<{label}>{pattern})' for label, pattern in REDACT_PATTERNS))
+    
+    # Cheap necessary condition for any pattern above: '@', a long digit run,
+    # a digit-dot-digit sequence or a long alphanumeric run
+    NEEDS_REDACTION_RE = re.compile(r'@|\d{8}|\d\.\d|[A-Za-z0-9]{32}')
+    
+    @staticmethod
+    def _redact(match: re.Match) -> str:
+        return f'[{match.lastgroup}]'
     
     def format(self, record: logging.LogRecord) -> str:
         """Format log record with PII redaction."""
         # Format the original message
         formatted = super().format(record)
         
-        # Apply redaction patterns
-        for pattern, replacement in self.REDACT_PATTERNS:
-            formatted = pattern.sub(replacement, formatted)
+        # Most records contain nothing worth redacting
+        if not self.NEEDS_REDACTION_RE.search(formatted):
+            return formatted
         
-        return formatted
+        # Apply redaction patterns in a single pass
+        return self.REDACT_RE.sub(self._redact, formatted)
+
+
+# Log file rotation and buffering
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUPS = 5
+LOG_BUFFER_CAPACITY = 128
+
+# Background listener that owns the console and file handlers
+_queue_listener: Optional[logging.handlers.QueueListener] = None
 
 
 def setup_logging() -> logging.Logger:
     """Setup secure logging configuration."""
+    global _queue_listener
     
     # Create logs directory if it doesn't exist
     log_dir = Path("logs")
@@ -43,9 +68,10 @@ def setup_logging() -> logging.Logger:
     
     # Configure root logger
     logger = logging.getLogger("telegram_translator")
-    logger.setLevel(getattr(logging, settings.log_level))
+    logger.setLevel(getattr(logging, get_settings().log_level))
     
     # Remove existing handlers
+    stop_logging()
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
     
@@ -58,18 +84,38 @@ def setup_logging() -> logging.Logger:
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
     
-    # File handler
-    file_handler = logging.FileHandler(log_dir / "bot.log", encoding="utf-8")
+    # File handler, batching records until a warning or a full buffer
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_dir / "bot.log",
+        maxBytes=LOG_FILE_MAX_BYTES,
+        backupCount=LOG_FILE_BACKUPS,
+        encoding="utf-8"
+    )
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    buffered_file_handler = logging.handlers.MemoryHandler(
+        LOG_BUFFER_CAPACITY, flushLevel=logging.WARNING, target=file_handler
+    )
     
     # Error file handler
-    error_handler = logging.FileHandler(log_dir / "error.log", encoding="utf-8")
+    error_handler = logging.handlers.RotatingFileHandler(
+        log_dir / "error.log",
+        maxBytes=LOG_FILE_MAX_BYTES,
+        backupCount=LOG_FILE_BACKUPS,
+        encoding="utf-8"
+    )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(formatter)
-    logger.addHandler(error_handler)
+    
+    # Hand records to a background thread so disk writes and redaction
+    # never block the event loop
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue, console_handler, buffered_file_handler, error_handler,
+        respect_handler_level=True
+    )
+    _queue_listener.start()
     
     # Disable propagation to avoid duplicate logs
     logger.propagate = False
@@ -82,31 +128,67 @@ def setup_logging() -> logging.Logger:
     return logger
 
 
+def stop_logging():
+    """Flush queued records and stop the background logging thread."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.flush()
+        _queue_listener = None
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance."""
     return logging.getLogger(f"telegram_translator.{name}")
 
 
+# Key fragments that mark a value as sensitive in log_safe_dict
+_DEFAULT_EXCLUDE_KEYS = frozenset({
+    'token', 'api_key', 'password', 'secret', 'key',
+    'authorization', 'auth', 'credentials', 'private'
+})
+_DEFAULT_EXCLUDE_RE = re.compile('|'.join(map(re.escape, sorted(_DEFAULT_EXCLUDE_KEYS))))
+
+
 def log_safe_dict(data: Dict[str, Any], exclude_keys: Optional[set] = None) -> Dict[str, Any]:
     """Create a safe dictionary for logging by excluding sensitive keys."""
     if exclude_keys is None:
-        exclude_keys = {
-            'token', 'api_key', 'password', 'secret', 'key', 
-            'authorization', 'auth', 'credentials', 'private'
-        }
-    
-    safe_data = {}
-    for key, value in data.items():
-        if any(sensitive in key.lower() for sensitive in exclude_keys):
-            safe_data[key] = '[REDACTED]'
-        elif isinstance(value, dict):
-            safe_data[key] = log_safe_dict(value, exclude_keys)
-        else:
-            safe_data[key] = value
+        is_sensitive = _DEFAULT_EXCLUDE_RE.search
+    else:
+        exclude_keys = frozenset(exclude_keys)
+        
+        def is_sensitive(key: str) -> bool:
+            return any(sensitive in key for sensitive in exclude_keys)
+    
+    # Walk nested dicts with an explicit stack, filling each copy in place
+    safe_data: Dict[str, Any] = {}
+    stack = [(data, safe_data)]
+    while stack:
+        source, target = stack.pop()
+        for key, value in source.items():
+            if is_sensitive(key.lower()):
+                target[key] = '[REDACTED]'
+            elif isinstance(value, dict):
+                target[key] = nested = {}
+                stack.append((value, nested))
+            else:
+                target[key] = value
     
     return safe_data
 
 
-# Initialize logger
-logger = setup_logging()
+@lru_cache(maxsize=None)
+def get_app_logger() -> logging.Logger:
+    """Configure logging on first use and return the application logger."""
+    app_logger = setup_logging()
+    atexit.register(stop_logging)
+    return app_logger
+
+
+def __getattr__(name: str) -> Any:
+    """Lazily resolve the module-level `logger`, configuring logging on first use."""
+    if name == "logger":
+        return get_app_logger()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
@@ -3,10 +3,11 @@
 import asyncio
 import time
 from collections import defaultdict, deque
-from typing import Dict, Tuple, Optional
+from typing import Any, Dict, Tuple, Optional
 from dataclasses import dataclass
+from functools import lru_cache
 
-from .config import settings
+from .config import get_settings
 from .logger import get_logger
 
 logger = get_logger(__name__)
@@ -80,6 +81,8 @@ class MultiLevelRateLimiter:
     """Multi-level rate limiter for different scopes."""
     
     def __init__(self):
+        settings = get_settings()
+        
         # User-level rate limiting
         self.user_limiter = RateLimiter(
             RateLimitConfig(
@@ -173,8 +176,17 @@ class MultiLevelRateLimiter:
             self._cleanup_task.cancel()
 
 
-# Global rate limiter instance
-rate_limiter = MultiLevelRateLimiter()
+@lru_cache(maxsize=None)
+def get_rate_limiter() -> MultiLevelRateLimiter:
+    """Get the global rate limiter, creating it on first use."""
+    return MultiLevelRateLimiter()
+
+
+def __getattr__(name: str) -> Any:
+    """Lazily resolve the module-level `rate_limiter` instance."""
+    if name == "rate_limiter":
+        return get_rate_limiter()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Decorator for rate limiting
@@ -185,7 +197,7 @@ def rate_limit(func):
         chat_id = message.chat.id if message.chat else user_id
         
         # Check rate limits
-        allowed, retry_after, limit_type = await rate_limiter.check_limits(user_id, chat_id)
+        allowed, retry_after, limit_type = await get_rate_limiter().check_limits(user_id, chat_id)
         
         if not allowed:
             # Import here to avoid circular imports
@@ -225,7 +237,7 @@ class RateLimitContext:
     
     async def __aenter__(self):
         """Check rate limits on enter."""
-        self.allowed, self.retry_after, self.limit_type = await rate_limiter.check_limits(
+        self.allowed, self.retry_after, self.limit_type = await get_rate_limiter().check_limits(
             self.user_id, self.chat_id
         )
         return self
@@ -3,7 +3,8 @@
 import asyncio
 import json
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -11,7 +12,7 @@ import httpx
 from google.cloud import translate_v2 as translate
 from google.oauth2 import service_account
 
-from .config import settings
+from .config import get_settings
 from .logger import get_logger
 from .i18n import detect_text_language, normalize_language_code
 
@@ -90,7 +91,7 @@ class DeepLProvider(BaseTranslationProvider):
     
     def __init__(self):
         super().__init__("DeepL")
-        self.api_key = settings.deepl_api_key
+        self.api_key = get_settings().deepl_api_key
         self.base_url = "https://api-free.deepl.com/v2"  # Use free API by default
         
         # Language code mappings for DeepL
@@ -220,6 +221,7 @@ class GoogleTranslateProvider(BaseTranslationProvider):
     """Google Cloud Translate provider."""
     
     def __init__(self):
+        settings = get_settings()
         super().__init__("Google Translate")
         self.project_id = settings.google_project_id
         self.credentials_path = settings.google_credentials_json_path
@@ -307,6 +309,7 @@ class LibreTranslateProvider(BaseTranslationProvider):
     """LibreTranslate provider."""
     
     def __init__(self):
+        settings = get_settings()
         super().__init__("LibreTranslate")
         self.base_url = settings.libre_base_url
         self.api_key = settings.libre_api_key
@@ -567,6 +570,7 @@ class TranslationService:
     """Main translation service with multiple provider support."""
     
     def __init__(self):
+        settings = get_settings()
         self.providers: Dict[str, BaseTranslationProvider] = {
             "DEEPL": DeepLProvider(),
             "GOOGLE": GoogleTranslateProvider(),
@@ -581,6 +585,8 @@ class TranslationService:
             name for name in fallback_order 
             if name != self.primary_provider and name in self.providers
         ]
+        # Updates are handled as concurrent tasks; cap fan-out to external providers
+        self._provider_semaphore = asyncio.Semaphore(settings.provider_concurrency)
     
     def get_available_providers(self) -> List[str]:
         """Get list of configured providers."""
@@ -634,7 +640,7 @@ class TranslationService:
             
             for attempt in range(max_retries + 1):
                 try:
-                    async with provider:
+                    async with self._provider_semaphore, provider:
                         result = await provider.translate(text, target_lang, source_lang)
                         logger.info(f"Translation successful with {provider_name}")
                         return result
@@ -662,7 +668,7 @@ class TranslationService:
         
         if provider and provider.is_configured():
             try:
-                async with provider:
+                async with self._provider_semaphore, provider:
                     return await provider.detect_language(text)
             except Exception as e:
                 logger.warning(f"Language detection failed with {self.primary_provider}: {e}")
@@ -702,5 +708,14 @@ class TranslationService:
         return results
 
 
-# Global translation service instance
-translation_service = TranslationService()
+@lru_cache(maxsize=None)
+def get_translation_service() -> TranslationService:
+    """Get the shared translation service, creating it on first use."""
+    return TranslationService()
+
+
+def __getattr__(name: str) -> Any:
+    """Lazily resolve the module-level `translation_service` instance."""
+    if name == "translation_service":
+        return get_translation_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,7 +5,7 @@ import unicodedata
 from typing import List, Optional, Tuple
 from datetime import datetime
 
-from .config import settings
+from .config import get_settings
 from .logger import get_logger
 
 logger = get_logger(__name__)
@@ -30,6 +30,7 @@ def normalize_text(text: str) -> str:
 
 def extract_text_from_message(message) -> str:
     """Extract text content from Telegram message."""
+    settings = get_settings()
     text_parts = []
     
     # Get main text
@@ -60,7 +61,7 @@ def extract_text_from_message(message) -> str:
 def split_long_message(text: str, max_length: int = None) -> List[str]:
     """Split long message into chunks that fit Telegram limits."""
     if max_length is None:
-        max_length = settings.max_comment_length
+        max_length = get_settings().max_comment_length
     
     if len(text) <= max_length:
         return [text]
@@ -135,7 +136,7 @@ def format_translation_comment(
         block = f"🌐 Translation ({source_lang}→{target_lang}):\n{translated_text}\n\n"
         
         # Check if we can add this block to current message
-        if len(current_message) + len(block) <= settings.max_comment_length:
+        if len(current_message) + len(block) <= get_settings().max_comment_length:
             current_message += block
         else:
             # Save current message and start new one
@@ -6,8 +6,8 @@ from aiogram.filters import Command
 from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
 
 from ..core.logger import get_logger
-from ..core.translate import translation_service, TranslationError
-from ..core.database import storage, is_autotranslate_enabled, get_channel_target_languages
+from ..core.translate import get_translation_service, TranslationError
+from ..core.database import get_storage
 from ..core.i18n import (
     get_localized_string, 
     detect_user_language,
@@ -22,7 +22,7 @@ from ..core.utils import (
     log_message_info,
     truncate_text_for_log
 )
-from ..core.config import settings
+from ..core.config import get_settings
 
 logger = get_logger(__name__)
 router = Router()
@@ -67,7 +67,7 @@ async def set_channel_languages(message: Message, is_admin: bool = False):
     
     try:
         # Save channel settings
-        await storage.set_channel_settings(chat_id, target_langs=languages)
+        await get_storage().set_channel_settings(chat_id, target_langs=languages)
         
         # Format language names for response
         lang_names = [get_language_name(lang, user_lang) for lang in languages]
@@ -121,7 +121,7 @@ async def toggle_autotranslate(message: Message, is_admin: bool = False):
     
     try:
         # Update channel settings
-        await storage.set_channel_settings(chat_id, autotranslate=enable)
+        await get_storage().set_channel_settings(chat_id, autotranslate=enable)
         
         if enable:
             success_text = get_localized_string("autotranslate_enabled", user_lang)
@@ -156,8 +156,8 @@ async def channel_stats(message: Message, is_admin: bool = False):
     
     try:
         # Get statistics
-        stats_24h = await storage.get_translation_stats(chat_id, days=1)
-        stats_7d = await storage.get_translation_stats(chat_id, days=7)
+        stats_24h = await get_storage().get_translation_stats(chat_id, days=1)
+        stats_7d = await get_storage().get_translation_stats(chat_id, days=7)
         
         stats_text = get_localized_string(
             "stats_message",
@@ -227,8 +227,11 @@ async def _process_channel_post(message: Message, is_edited: bool = False):
     log_message_info(message, f"channel post {'(edited)' if is_edited else ''}")
     
     try:
+        # One settings lookup serves both the autotranslate flag and target languages
+        channel_settings = await get_storage().get_channel_settings(chat_id)
+        
         # Check if auto-translation is enabled
-        if not await is_autotranslate_enabled(chat_id):
+        if not channel_settings["autotranslate"]:
             logger.debug(f"Auto-translation disabled for chat {chat_id}")
             return
         
@@ -242,14 +245,14 @@ async def _process_channel_post(message: Message, is_edited: bool = False):
         logger.info(f"Processing channel post: {truncate_text_for_log(text)}")
         
         # Get target languages for this channel
-        target_languages = await get_channel_target_languages(chat_id)
+        target_languages = channel_settings["target_langs"]
         
         if not target_languages:
             logger.warning(f"No target languages configured for chat {chat_id}")
             return
         
         # Detect source language
-        source_lang = await translation_service.detect_language(text)
+        source_lang = await get_translation_service().detect_language(text)
         
         # Filter out languages that match source
         target_languages = [
@@ -262,7 +265,7 @@ async def _process_channel_post(message: Message, is_edited: bool = False):
             return
         
         # Perform translations
-        translations = await translation_service.translate_multiple(
+        translations = await get_translation_service().translate_multiple(
             text, target_languages, source_lang
         )
         
@@ -279,7 +282,7 @@ async def _process_channel_post(message: Message, is_edited: bool = False):
         await _post_translation_comments(message, comment_messages)
         
         # Record statistics
-        await storage.record_translation_stats(
+        get_storage().record_translation_stats(
             chat_id, 
             posts=1, 
             translations=len(translations)
@@ -311,7 +314,7 @@ def _format_translation_comments(translations, source_lang: str, is_edited: bool
         block = f"{translated_text}\n\n"
         
         # Check if we can add this block to current message
-        if len(current_message) + len(block) <= settings.max_comment_length:
+        if len(current_message) + len(block) <= get_settings().max_comment_length:
             current_message += block
         else:
             # Save current message and start new one
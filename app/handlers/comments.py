@@ -5,8 +5,8 @@ from aiogram.types import Message
 from aiogram.exceptions import TelegramAPIError
 
 from ..core.logger import get_logger
-from ..core.translate import translation_service, TranslationError
-from ..core.database import storage, get_channel_target_languages
+from ..core.translate import get_translation_service, TranslationError
+from ..core.database import get_storage, get_channel_target_languages
 from ..core.i18n import (
     get_localized_string, 
     detect_user_language,
@@ -76,7 +76,7 @@ async def _process_comment_translation(message: Message):
             return
         
         # Detect source language
-        source_lang = await translation_service.detect_language(text)
+        source_lang = await get_translation_service().detect_language(text)
         
         # Filter out languages that match source
         target_langs = [lang for lang in target_langs if lang != source_lang]
@@ -93,11 +93,11 @@ async def _process_comment_translation(message: Message):
         # Perform translations
         if len(target_langs) == 1:
             # Single translation
-            result = await translation_service.translate(text, target_langs[0], source_lang)
+            result = await get_translation_service().translate(text, target_langs[0], source_lang)
             await _send_single_translation(message, result)
         else:
             # Multiple translations
-            results = await translation_service.translate_multiple(text, target_langs, source_lang)
+            results = await get_translation_service().translate_multiple(text, target_langs, source_lang)
             await _send_multiple_translations(message, results, source_lang)
         
         logger.info(f"Comment translation completed: {source_lang}→{target_langs}")
@@ -132,7 +132,7 @@ async def _determine_target_languages(message: Message, user_id: int, chat_id: i
     
     # Try to get user's preferred language
     try:
-        user_settings = await storage.get_user_settings(user_id)
+        user_settings = await get_storage().get_user_settings(user_id)
         user_target_lang = user_settings.get("target_lang") if user_settings else None
         
         if user_target_lang:
@@ -181,8 +181,8 @@ async def _send_multiple_translations(message: Message, results: list, source_la
     response = "\n".join(response_parts)
     
     # Check if message is too long
-    from ..core.config import settings
-    if len(response) > settings.max_comment_length:
+    from ..core.config import get_settings
+    if len(response) > get_settings().max_comment_length:
         # Send translations separately
         for result in results:
             await _send_single_translation(message, result)
@@ -6,7 +6,7 @@ from aiogram.filters import ChatMemberUpdatedFilter, ADMINISTRATOR, MEMBER, KICK
 from aiogram.exceptions import TelegramAPIError
 
 from ..core.logger import get_logger
-from ..core.database import storage
+from ..core.database import get_storage
 from ..core.i18n import get_localized_string, detect_user_language
 from ..core.utils import log_message_info
 
@@ -45,10 +45,10 @@ async def bot_added_as_admin(event: ChatMemberUpdated):
     logger.info(f"Bot added as admin to {chat.type} {chat.id} by user {user.id}")
     
     # Save user-channel relationship
-    await storage.add_user_channel(user.id, chat.id, chat.title)
+    await get_storage().add_user_channel(user.id, chat.id, chat.title)
     
     # Get user's language preference
-    user_settings = await storage.get_user_settings(user.id)
+    user_settings = await get_storage().get_user_settings(user.id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     # Check if channel has discussion group
@@ -127,7 +127,7 @@ async def bot_removed_from_chat(event: ChatMemberUpdated):
     logger.info(f"Bot removed from {chat.type} {chat.id} by user {user.id}")
     
     # Remove user-channel relationship
-    await storage.remove_user_channel(user.id, chat.id)
+    await get_storage().remove_user_channel(user.id, chat.id)
 
 
 @router.callback_query(F.data.startswith("check_discussion_"))
@@ -137,7 +137,7 @@ async def check_discussion_callback(callback_query):
     
     try:
         # Get user language
-        user_settings = await storage.get_user_settings(callback_query.from_user.id)
+        user_settings = await get_storage().get_user_settings(callback_query.from_user.id)
         user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
         
         # Check if discussion group is now enabled
@@ -181,7 +181,7 @@ async def show_discussion_help_callback(callback_query):
     """Show how to enable discussion group."""
     try:
         # Get user language
-        user_settings = await storage.get_user_settings(callback_query.from_user.id)
+        user_settings = await get_storage().get_user_settings(callback_query.from_user.id)
         user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
         
         instructions_text = get_localized_string("discussion_instructions", user_lang)
@@ -203,7 +203,7 @@ async def back_to_discussion_check_callback(callback_query):
     """Go back to discussion check screen."""
     try:
         # Get user language
-        user_settings = await storage.get_user_settings(callback_query.from_user.id)
+        user_settings = await get_storage().get_user_settings(callback_query.from_user.id)
         user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
         
         no_discussion_text = get_localized_string("channel_no_discussion", user_lang)
@@ -233,7 +233,7 @@ async def channel_language_callback(callback_query):
     
     try:
         # Get current channel settings or create new
-        channel_settings = await storage.get_channel_settings(chat_id)
+        channel_settings = await get_storage().get_channel_settings(chat_id)
         
         # Update target languages (add to existing or create new list)
         current_langs = channel_settings.get("target_langs", []) if channel_settings else []
@@ -241,11 +241,11 @@ async def channel_language_callback(callback_query):
             current_langs.append(selected_lang)
             
         # Save updated settings - используем правильный формат для storage
-        await storage.set_channel_settings(chat_id, target_langs=current_langs, autotranslate=True)
+        await get_storage().set_channel_settings(chat_id, target_langs=current_langs, autotranslate=True)
         
         # Update the message to show selected languages
         user_lang = "en"  # Default for now
-        user_settings = await storage.get_user_settings(callback_query.from_user.id)
+        user_settings = await get_storage().get_user_settings(callback_query.from_user.id)
         if user_settings:
             user_lang = user_settings.get("target_lang", "en")
             
@@ -271,7 +271,7 @@ async def channel_setup_done_callback(callback_query):
     
     try:
         # Get user language
-        user_settings = await storage.get_user_settings(callback_query.from_user.id)
+        user_settings = await get_storage().get_user_settings(callback_query.from_user.id)
         user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
         
         success_text = get_localized_string("channel_setup_success", user_lang)
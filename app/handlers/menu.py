@@ -6,8 +6,8 @@ from aiogram.filters import Command
 from aiogram.exceptions import TelegramAPIError
 
 from ..core.logger import get_logger
-from ..core.database import storage
-from ..core.i18n import get_localized_string, detect_user_language
+from ..core.database import get_storage
+from ..core.i18n import get_localized_string, get_localized_strings, detect_user_language
 from ..core.utils import log_message_info
 
 logger = get_logger(__name__)
@@ -16,30 +16,34 @@ router = Router()
 
 def create_main_menu_keyboard(user_lang: str) -> InlineKeyboardMarkup:
     """Create main menu keyboard with buttons."""
+    labels = get_localized_strings(
+        ("interface_language", "translation_language", "my_channels", "setup_guide", "help_menu"),
+        user_lang
+    )
     return InlineKeyboardMarkup(inline_keyboard=[
         [
             InlineKeyboardButton(
-                text=get_localized_string("interface_language", user_lang),
+                text=labels["interface_language"],
                 callback_data="menu_interface_lang"
             ),
             InlineKeyboardButton(
-                text=get_localized_string("translation_language", user_lang),
+                text=labels["translation_language"],
                 callback_data="menu_translation_lang"
             )
         ],
         [
             InlineKeyboardButton(
-                text=get_localized_string("my_channels", user_lang),
+                text=labels["my_channels"],
                 callback_data="menu_my_channels"
             ),
             InlineKeyboardButton(
-                text=get_localized_string("setup_guide", user_lang),
+                text=labels["setup_guide"],
                 callback_data="menu_setup_guide"
             )
         ],
         [
             InlineKeyboardButton(
-                text=get_localized_string("help_menu", user_lang),
+                text=labels["help_menu"],
                 callback_data="menu_help"
             )
         ]
@@ -90,7 +94,7 @@ async def menu_command(message: Message):
     user_id = message.from_user.id
     
     # Get user's interface language
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     menu_text = get_localized_string("main_menu", user_lang)
@@ -109,7 +113,7 @@ async def interface_language_callback(callback_query: CallbackQuery):
     user_id = callback_query.from_user.id
     
     # Get current language for the message
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     selection_text = get_localized_string("language_selection", user_lang)
@@ -129,7 +133,7 @@ async def translation_language_callback(callback_query: CallbackQuery):
     user_id = callback_query.from_user.id
     
     # Get current language for the message
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     explanation_text = get_localized_string("translation_lang_explanation", user_lang)
@@ -149,12 +153,12 @@ async def my_channels_callback(callback_query: CallbackQuery):
     user_id = callback_query.from_user.id
     
     # Get current language
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     try:
         # Get user's channels from database
-        channels = await storage.get_user_channels(user_id)
+        channels = await get_storage().get_user_channels(user_id)
         
         if not channels:
             # No channels connected
@@ -228,11 +232,11 @@ async def set_interface_language_callback(callback_query: CallbackQuery):
     
     try:
         # Save interface language preference
-        await storage.set_user_settings(user_id, selected_lang)
+        await get_storage().set_user_settings(user_id, selected_lang)
         
         # Update bot commands for this user
-        from ..bot import translation_bot
-        await translation_bot.update_user_commands(user_id, selected_lang)
+        from ..bot import get_bot
+        await get_bot().update_user_commands(user_id, selected_lang)
         
         # Show success message and return to menu
         success_text = "✅ Interface language updated!" if selected_lang == "en" else "✅ Язык интерфейса обновлен!"
@@ -256,7 +260,7 @@ async def set_translation_language_callback(callback_query: CallbackQuery):
     
     try:
         # Get current interface language
-        user_settings = await storage.get_user_settings(user_id)
+        user_settings = await get_storage().get_user_settings(user_id)
         interface_lang = user_settings.get("target_lang", "en") if user_settings else "en"
         
         # Save translation language preference (we'll add this field to user settings)
@@ -286,7 +290,7 @@ async def back_to_menu_callback(callback_query: CallbackQuery):
     user_id = callback_query.from_user.id
     
     # Get current interface language
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     menu_text = get_localized_string("main_menu", user_lang)
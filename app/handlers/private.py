@@ -6,15 +6,17 @@ from aiogram.filters import Command, CommandStart
 from aiogram.exceptions import TelegramAPIError
 
 from ..core.logger import get_logger
-from ..core.translate import translation_service, TranslationError
-from ..core.database import storage
+from ..core.translate import get_translation_service, TranslationError
+from ..core.database import get_storage
 from ..core.i18n import (
     get_localized_string, 
+    get_localized_strings,
     detect_user_language, 
     normalize_language_code,
     get_supported_languages_list,
     extract_language_from_text,
-    get_language_name
+    get_language_name,
+    SUPPORTED_LANGUAGES
 )
 from ..core.utils import (
     extract_text_from_message, 
@@ -23,7 +25,7 @@ from ..core.utils import (
     log_message_info,
     truncate_text_for_log
 )
-from ..core.config import settings
+from ..core.config import get_settings
 
 logger = get_logger(__name__)
 router = Router()
@@ -37,26 +39,25 @@ async def start_command(message: Message):
     user_id = message.from_user.id
     
     # Check if user already has language preference
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     if user_settings:
         # User already has language, show normal start message
         user_lang = user_settings.get("target_lang", "en")
         
         # Update bot commands for this user to match their language
         try:
-            from ..bot import translation_bot
-            await translation_bot.update_user_commands(user_id, user_lang)
+            from ..bot import get_bot
+            await get_bot().update_user_commands(user_id, user_lang)
         except Exception as e:
             logger.warning(f"Failed to update commands for user {user_id}: {e}")
         
         bot_username = (await message.bot.get_me()).username
         
-        start_text = get_localized_string("start_message", user_lang)
-        languages_text = get_localized_string("supported_languages", user_lang)
+        texts = get_localized_strings(("start_message", "supported_languages", "add_to_group"), user_lang)
         
-        full_message = f"{start_text}\n\n{languages_text}"
+        full_message = f"{texts['start_message']}\n\n{texts['supported_languages']}"
         
-        add_to_chat_text = get_localized_string("add_to_group", user_lang)
+        add_to_chat_text = texts["add_to_group"]
         menu_button_text = "🏠 Main Menu" if user_lang == "en" else "🏠 Главное меню"
         
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -110,22 +111,21 @@ async def language_selection_callback(callback_query: CallbackQuery):
     
     try:
         # Save user language preference
-        await storage.set_user_settings(user_id, selected_lang)
+        await get_storage().set_user_settings(user_id, selected_lang)
         
         # Update bot commands for this user
-        from ..bot import translation_bot
-        await translation_bot.update_user_commands(user_id, selected_lang)
+        from ..bot import get_bot
+        await get_bot().update_user_commands(user_id, selected_lang)
         
         # Get bot username
         bot_username = (await callback_query.bot.get_me()).username
         
         # Show start message in selected language
-        start_text = get_localized_string("start_message", selected_lang)
-        languages_text = get_localized_string("supported_languages", selected_lang)
+        texts = get_localized_strings(("start_message", "supported_languages", "add_to_group"), selected_lang)
         
-        full_message = f"{start_text}\n\n{languages_text}"
+        full_message = f"{texts['start_message']}\n\n{texts['supported_languages']}"
         
-        add_to_chat_text = get_localized_string("add_to_group", selected_lang)
+        add_to_chat_text = texts["add_to_group"]
         menu_button_text = "🏠 Main Menu" if selected_lang == "en" else "🏠 Главное меню"
         
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -159,7 +159,7 @@ async def show_main_menu_callback(callback_query: CallbackQuery):
     user_id = callback_query.from_user.id
     
     # Get user's interface language
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     menu_text = get_localized_string("main_menu", user_lang)
@@ -181,7 +181,7 @@ async def help_command(message: Message):
     user_id = message.from_user.id
     
     # Get user's language from database settings
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     # Get bot username for help message
@@ -212,15 +212,14 @@ async def set_language_command(message: Message):
     user_id = message.from_user.id
     
     # Get user's language from database settings
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     # Extract language code from command
     lang_arg = extract_command_args(message.text, "set_my_lang")
     
     if not lang_arg:
-        from ..core.i18n import SupportedLanguage
-        supported_langs = ", ".join([lang.value for lang in SupportedLanguage])
+        supported_langs = ", ".join(SUPPORTED_LANGUAGES)
         error_text = get_localized_string("invalid_language", user_lang, languages=supported_langs)
         
         try:
@@ -233,8 +232,7 @@ async def set_language_command(message: Message):
     normalized_lang = normalize_language_code(lang_arg)
     
     if not normalized_lang:
-        from ..core.i18n import SupportedLanguage
-        supported_langs = ", ".join([lang.value for lang in SupportedLanguage])
+        supported_langs = ", ".join(SUPPORTED_LANGUAGES)
         error_text = get_localized_string("invalid_language", user_lang, languages=supported_langs)
         
         try:
@@ -245,11 +243,11 @@ async def set_language_command(message: Message):
     
     # Save user language preference
     try:
-        await storage.set_user_settings(user_id, normalized_lang)
+        await get_storage().set_user_settings(user_id, normalized_lang)
         
         # Update bot commands for this user
-        from ..bot import translation_bot
-        await translation_bot.update_user_commands(user_id, normalized_lang)
+        from ..bot import get_bot
+        await get_bot().update_user_commands(user_id, normalized_lang)
         
         # Get language name for confirmation
         lang_name = get_language_name(normalized_lang, user_lang)
@@ -280,7 +278,7 @@ async def privacy_command(message: Message):
     user_id = message.from_user.id
     
     # Get user's language from database settings
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     privacy_text = get_localized_string("privacy_message", user_lang)
@@ -300,13 +298,13 @@ async def provider_command(message: Message):
     user_id = message.from_user.id
     
     # Get user's language from database settings
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     provider_text = get_localized_string(
         "provider_info", 
         user_lang,
-        provider=settings.translator_provider
+        provider=get_settings().translator_provider
     )
     
     try:
@@ -326,7 +324,7 @@ async def menu_command_private(message: Message):
     user_id = message.from_user.id
     
     # Get user's interface language
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     menu_text = get_localized_string("main_menu", user_lang)
@@ -347,7 +345,7 @@ async def setup_command_private(message: Message):
     user_id = message.from_user.id
     
     # Get user's language from database settings
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     # Get bot username
@@ -369,7 +367,7 @@ async def languages_command_private(message: Message):
     user_id = message.from_user.id
     
     # Get current user language for the message
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     # Get current language name
@@ -426,14 +424,14 @@ async def translate_private_message(message: Message):
         
         if not target_lang:
             # Get user's preferred language
-            user_settings = await storage.get_user_settings(user_id)
+            user_settings = await get_storage().get_user_settings(user_id)
             target_lang = user_settings.get("target_lang", "en") if user_settings else "en"
         
         if clean_text != text:
             text = clean_text  # Use cleaned text if language was extracted
         
         # Detect source language
-        source_lang = await translation_service.detect_language(text)
+        source_lang = await get_translation_service().detect_language(text)
         
         # Check if translation is needed
         if source_lang == target_lang:
@@ -446,7 +444,7 @@ async def translate_private_message(message: Message):
             return
         
         # Perform translation
-        result = await translation_service.translate(text, target_lang, source_lang)
+        result = await get_translation_service().translate(text, target_lang, source_lang)
         
         # Format response
         source_name = get_language_name(result.source_lang)
@@ -488,6 +486,7 @@ async def translate_private_message(message: Message):
 @router.message(Command("debug_stats"))
 async def debug_stats_command(message: Message):
     """Debug command to show translation stats."""
+    settings = get_settings()
     user_id = message.from_user.id
     
     # Only allow for specific admin users (you can configure this)
@@ -496,7 +495,7 @@ async def debug_stats_command(message: Message):
     
     try:
         # Get available providers
-        providers = translation_service.get_available_providers()
+        providers = get_translation_service().get_available_providers()
         
         response = f"🔧 **Debug Info**\n\n"
         response += f"**Available Providers:** {', '.join(providers)}\n"
@@ -518,12 +517,12 @@ async def my_channels_command(message: Message):
     user_id = message.from_user.id
     
     # Get user's interface language
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     try:
         # Get user's channels from database
-        channels = await storage.get_user_channels(user_id)
+        channels = await get_storage().get_user_channels(user_id)
         
         # If no channels found, try to sync by checking where bot is admin
         if not channels:
@@ -640,11 +639,11 @@ async def reset_user_data(message: Message):
     user_id = message.from_user.id
     
     # Get user's language from database settings
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     try:
-        await storage.delete_user_data(user_id)
+        await get_storage().delete_user_data(user_id)
         
         if user_lang == "ru":
             response = "✅ Ваши данные удалены."
@@ -671,7 +670,7 @@ async def commands_list(message: Message):
     user_id = message.from_user.id
     
     # Get user's language from database settings
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     if user_lang == "ru":
@@ -744,7 +743,7 @@ async def setup_guide_callback(callback: CallbackQuery):
     user_id = callback.from_user.id
     
     # Get user's language from database settings
-    user_settings = await storage.get_user_settings(user_id)
+    user_settings = await get_storage().get_user_settings(user_id)
     user_lang = user_settings.get("target_lang", "en") if user_settings else "en"
     
     # Get bot username
@@ -9,7 +9,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from app.core.config import settings
+from app.core.config import get_settings
 from app.core.logger import logger
 from app.bot import run_bot
 
@@ -27,6 +27,7 @@ def setup_signal_handlers():
 
 async def main():
     """Main function."""
+    settings = get_settings()
     logger.info("Starting Telegram Translation Bot...")
     logger.info(f"Mode: {settings.mode}")
     logger.info(f"Provider: {settings.translator_provider}")
@@ -2,6 +2,7 @@
 
 from .throttling import ThrottlingMiddleware
 from .auth import AuthMiddleware
+from .request_throttling import OutgoingThrottlingMiddleware
 
-__all__ = ["ThrottlingMiddleware", "AuthMiddleware"]
+__all__ = ["ThrottlingMiddleware", "AuthMiddleware", "OutgoingThrottlingMiddleware"]
 
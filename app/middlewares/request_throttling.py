@@ -0,0 +1,106 @@
+"""Outgoing request throttling to stay within Telegram Bot API limits."""
+
+import asyncio
+import time
+from typing import Any, Dict
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from ..core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursting up to `capacity`."""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    async def acquire(self):
+        """Wait until a token is available and consume it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    def is_idle(self) -> bool:
+        """Check whether the bucket has refilled completely."""
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity and not self._lock.locked()
+
+
+class OutgoingThrottlingMiddleware(BaseRequestMiddleware):
+    """Session middleware queueing Bot API calls instead of hitting 429 errors.
+    
+    Limits follow Telegram's documented guidance: ~30 requests per second
+    overall, 1 message per second per private chat and 20 messages per minute
+    per group.
+    """
+    
+    # Only message-producing methods count towards per-chat limits
+    CHAT_LIMITED_PREFIXES = ("send", "copyMessage", "forwardMessage")
+    
+    # Prune idle per-chat buckets once this many have accumulated
+    MAX_CHAT_BUCKETS = 10000
+    
+    def __init__(
+        self,
+        global_rate: float = 30,
+        private_chat_rate: float = 1,
+        group_rate_per_minute: float = 20
+    ):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.private_chat_rate = private_chat_rate
+        self.group_rate_per_minute = group_rate_per_minute
+        self._chat_buckets: Dict[Any, TokenBucket] = {}
+    
+    def _get_chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= self.MAX_CHAT_BUCKETS:
+                self._prune_chat_buckets()
+            
+            # Group and channel ids are negative (or @usernames); private chats are positive
+            if isinstance(chat_id, int) and chat_id > 0:
+                bucket = TokenBucket(self.private_chat_rate, 1)
+            else:
+                bucket = TokenBucket(self.group_rate_per_minute / 60, self.group_rate_per_minute)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+    
+    def _prune_chat_buckets(self):
+        idle = [chat_id for chat_id, bucket in self._chat_buckets.items() if bucket.is_idle()]
+        for chat_id in idle:
+            del self._chat_buckets[chat_id]
+        logger.debug(f"Pruned {len(idle)} idle chat throttling buckets")
+    
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        """Wait for per-chat and global capacity, then perform the request."""
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is not None and method.__api_method__.startswith(self.CHAT_LIMITED_PREFIXES):
+            await self._get_chat_bucket(chat_id).acquire()
+        
+        await self.global_bucket.acquire()
+        
+        return await make_request(bot, method)
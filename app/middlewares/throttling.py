@@ -4,7 +4,7 @@ from typing import Callable, Dict, Any, Awaitable
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject, Message
 
-from ..core.rate_limit import rate_limiter
+from ..core.rate_limit import get_rate_limiter
 from ..core.logger import get_logger
 from ..core.i18n import get_localized_string, detect_user_language
 
@@ -39,7 +39,7 @@ class ThrottlingMiddleware(BaseMiddleware):
         chat_id = message.chat.id if message.chat else user_id
         
         # Check rate limits
-        allowed, retry_after, limit_type = await rate_limiter.check_limits(user_id, chat_id)
+        allowed, retry_after, limit_type = await get_rate_limiter().check_limits(user_id, chat_id)
         
         if not allowed:
             # Log rate limit hit
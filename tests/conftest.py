@@ -0,0 +1,19 @@
+"""Shared test fixtures."""
+
+import os
+
+import pytest
+
+# Settings are read lazily, but storage defaults still need a valid config
+os.environ.setdefault("BOT_TOKEN", "123456:test-token")
+
+from app.core.database import UniversalStorage
+
+
+@pytest.fixture
+async def storage(tmp_path):
+    """Initialized storage on a fresh database file."""
+    db = UniversalStorage(f"sqlite:///{tmp_path / 'bot.db'}")
+    await db.initialize()
+    yield db
+    await db.close()
@@ -0,0 +1,50 @@
+"""Tests for settings validation and mode inference."""
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    """Keep the developer's environment out of the settings under test."""
+    for name in ("MODE", "WEBHOOK_URL", "TRANSLATOR_PROVIDER", "LOG_LEVEL"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def make_settings(**values) -> Settings:
+    return Settings(_env_file=None, bot_token="123456:test-token", **values)
+
+
+def test_mode_defaults_to_polling_without_webhook_url():
+    assert make_settings().mode == "polling"
+
+
+def test_mode_is_inferred_from_webhook_url():
+    assert make_settings(webhook_url="https://example.com/webhook").mode == "webhook"
+
+
+def test_explicit_mode_overrides_inference():
+    settings = make_settings(mode="polling", webhook_url="https://example.com/webhook")
+    assert settings.mode == "polling"
+
+
+def test_mode_is_read_from_the_environment(monkeypatch):
+    monkeypatch.setenv("MODE", "Webhook")
+    assert make_settings().mode == "webhook"
+
+
+def test_enum_values_are_case_insensitive():
+    settings = make_settings(mode="WEBHOOK", translator_provider="deepl", log_level="debug")
+    assert (settings.mode, settings.translator_provider, settings.log_level) == ("webhook", "DEEPL", "DEBUG")
+
+
+@pytest.mark.parametrize("field, value", [
+    ("mode", "push"),
+    ("translator_provider", "bing"),
+    ("log_level", "verbose"),
+])
+def test_invalid_enum_values_are_rejected(field, value):
+    with pytest.raises(ValidationError):
+        make_settings(**{field: value})
@@ -0,0 +1,154 @@
+"""Tests for the SQLite storage layer."""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.core import database
+from app.core.database import DatabaseError, UniversalStorage
+
+
+async def test_settings_cache_sees_writes_from_other_connections(storage, monkeypatch):
+    monkeypatch.setattr(database, "DATA_VERSION_CHECK_INTERVAL", 0)
+    other = UniversalStorage(storage.database_url)
+    await other.initialize()
+    try:
+        await storage.set_channel_settings(1, target_langs=["ru"])
+        assert (await other.get_channel_settings(1))["autotranslate"] == 1
+        
+        # Served from other's cache unless the foreign commit is noticed
+        await storage.set_channel_settings(1, autotranslate=False)
+        assert (await other.get_channel_settings(1))["autotranslate"] == 0
+        
+        await other.set_user_settings(5, "ru")
+        assert await storage.get_user_settings(5) == {"target_lang": "ru"}
+        await other.set_user_settings(5, "en")
+        assert await storage.get_user_settings(5) == {"target_lang": "en"}
+    finally:
+        await other.close()
+
+
+async def test_settings_cache_hits_skip_the_database(storage, monkeypatch):
+    monkeypatch.setattr(database, "DATA_VERSION_CHECK_INTERVAL", 3600)
+    await storage.set_channel_settings(1, target_langs=["ru"])
+    expected = await storage.get_channel_settings(1)
+    
+    async def no_query(*args, **kwargs):
+        raise AssertionError("cache hit queried the database")
+    
+    # Within the interval neither the row nor PRAGMA data_version is read
+    monkeypatch.setattr(storage, "_execute_query", no_query)
+    assert await storage.get_channel_settings(1) == expected
+
+
+async def test_close_flushes_buffered_stats(tmp_path):
+    url = f"sqlite:///{tmp_path / 'bot.db'}"
+    db = UniversalStorage(url)
+    await db.initialize()
+    db.record_translation_stats(7, posts=1, translations=2)
+    await db.close()
+    
+    db = UniversalStorage(url)
+    await db.initialize()
+    try:
+        assert await db.get_translation_stats(7) == {"posts": 1, "translations": 2}
+    finally:
+        await db.close()
+
+
+async def test_cancelled_write_rolls_back(storage):
+    task = asyncio.create_task(storage.set_user_settings(5, "ru"))
+    while not storage._conn.in_transaction:
+        await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    
+    assert not storage._conn.in_transaction
+    await storage.set_user_settings(5, "en")
+    assert await storage.get_user_settings(5) == {"target_lang": "en"}
+
+
+async def test_failed_schema_setup_releases_connection(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'bot.db'}"
+    
+    async def broken_tables(self, db):
+        raise RuntimeError("disk full")
+    
+    db = UniversalStorage(url)
+    with monkeypatch.context() as patch:
+        patch.setattr(UniversalStorage, "_create_sqlite_tables", broken_tables)
+        with pytest.raises(DatabaseError):
+            await db.initialize()
+    assert db._conn is None
+    
+    # The aborted schema transaction must not keep the write lock
+    await db.initialize()
+    try:
+        await db.set_user_settings(5, "ru")
+        assert await db.get_user_settings(5) == {"target_lang": "ru"}
+    finally:
+        await db.close()
+
+
+async def test_partial_channel_update_keeps_other_fields(storage):
+    await storage.set_channel_settings(1, target_langs=["ru", "de"], autotranslate=True)
+    
+    await storage.set_channel_settings(1, autotranslate=False)
+    storage.invalidate_channel(1)
+    assert await storage.get_channel_settings(1) == {"target_langs": ["ru", "de"], "autotranslate": 0}
+    
+    await storage.set_channel_settings(1, target_langs=["en"])
+    storage.invalidate_channel(1)
+    assert await storage.get_channel_settings(1) == {"target_langs": ["en"], "autotranslate": 0}
+
+
+async def test_repeated_stats_accumulate_in_one_row(storage):
+    storage.record_translation_stats(7, posts=1, translations=2)
+    await storage.flush_stats()
+    storage.record_translation_stats(7, posts=3, translations=4)
+    await storage.flush_stats()
+    
+    rows = await storage._conn.execute_fetchall(
+        "SELECT posts, translations FROM stats WHERE channel_id = ?", (7,)
+    )
+    assert [tuple(row) for row in rows] == [(4, 6)]
+
+
+async def test_old_stats_table_is_merged_and_made_unique(tmp_path):
+    path = tmp_path / "bot.db"
+    # Pre-UNIQUE schema, user_version 0, with duplicate daily rows
+    with sqlite3.connect(path) as conn:
+        conn.execute("""
+            CREATE TABLE stats (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                channel_id INTEGER NOT NULL,
+                posts INTEGER NOT NULL DEFAULT 0,
+                translations INTEGER NOT NULL DEFAULT 0,
+                created_at INTEGER NOT NULL
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO stats (date, channel_id, posts, translations, created_at) VALUES (?, ?, ?, ?, 0)",
+            [("2024-01-01", 7, 1, 2), ("2024-01-01", 7, 3, 4), ("2024-01-01", 8, 5, 6), ("2024-01-02", 7, 1, 1)],
+        )
+    conn.close()
+    
+    db = UniversalStorage(f"sqlite:///{path}")
+    await db.initialize()
+    try:
+        rows = await db._conn.execute_fetchall(
+            "SELECT date, channel_id, posts, translations FROM stats ORDER BY date, channel_id"
+        )
+        assert [tuple(row) for row in rows] == [
+            ("2024-01-01", 7, 4, 6),
+            ("2024-01-01", 8, 5, 6),
+            ("2024-01-02", 7, 1, 1),
+        ]
+        
+        indexes = await db._conn.execute_fetchall("PRAGMA index_list(stats)")
+        assert {row[1]: row[2] for row in indexes}["idx_stats_date_channel_unique"] == 1
+    finally:
+        await db.close()
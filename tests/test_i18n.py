@@ -0,0 +1,63 @@
+"""Tests for locale loading and lookup."""
+
+import pytest
+
+from app.core.i18n import (
+    DETECT_CACHE_MAX_LEN,
+    LOCALES_DIR,
+    _LazyLocales,
+    _detect_text_language_cached,
+    clear_detection_cache,
+    detect_text_language,
+)
+
+
+def test_lazy_locales_behave_like_a_loaded_mapping():
+    strings = _LazyLocales(LOCALES_DIR)
+    
+    # Membership and get() must not depend on what was indexed before
+    assert "ru" in strings
+    assert strings.get("ru")["rate_limit"]
+    assert "xx" not in strings
+    assert strings.get("xx") is None
+    assert set(strings) == strings.available
+
+
+@pytest.mark.parametrize("text, lang", [
+    ("Привет мир", "ru"),
+    ("Hello world", "en"),
+    ("这是一个测试", "zh"),
+    ("Merhaba dünya çok güzel", "tr"),
+    ("مرحبا بالعالم", "ar"),
+    ("hi", "en"),
+])
+def test_detect_text_language_by_script(text, lang):
+    assert detect_text_language(text) == lang
+
+
+def test_detect_text_language_mixed_scripts():
+    # 7 Cyrillic characters (70) outweigh one word match on 18 characters
+    assert detect_text_language("Привет hello world") == "ru"
+    # One Cyrillic character (10) loses to a German word match on 24 characters
+    assert detect_text_language("der Hund und die Katze я") == "de"
+    # Kanji count for zh, kana for ja; the larger count wins
+    assert detect_text_language("日本語のテキストです") == "ja"
+
+
+def test_detect_text_language_ties_keep_the_earlier_language():
+    # Three Cyrillic and three Turkish characters: ru comes first
+    assert detect_text_language("абв çğı") == "ru"
+    # Script score 10 equals the word score len(text) == 10: the script wins
+    assert detect_text_language("der Hund я") == "ru"
+
+
+def test_detect_text_language_long_text_bypasses_cache():
+    clear_detection_cache()
+    text = "Привет " * 100
+    assert len(text) > DETECT_CACHE_MAX_LEN
+    
+    assert detect_text_language(text) == "ru"
+    assert _detect_text_language_cached.cache_info().currsize == 0
+    
+    assert detect_text_language("Привет мир") == "ru"
+    assert _detect_text_language_cached.cache_info().currsize == 1
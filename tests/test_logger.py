@@ -0,0 +1,47 @@
+"""Tests for PII redaction in log output."""
+
+import logging
+
+import pytest
+
+from app.core.logger import PIISafeFormatter
+
+TOKEN = "1234567890:" + "A" * 35
+API_KEY = "k" * 20 + "0123456789ab"
+
+REDACTED = [
+    (f"Using token {TOKEN}", "Using token [BOT_TOKEN]"),
+    (f"Provider key {API_KEY} loaded", "Provider key [API_KEY] loaded"),
+    ("Message from user 123456789", "Message from user [USER_ID]"),
+    ("Mention of @some_user here", "Mention of [USERNAME] here"),
+    ("Contact john.doe@example.com", "Contact [EMAIL]"),
+    ("Request from 192.168.1.10", "Request from [IP]"),
+]
+
+CLEAN = [
+    "Bot started",
+    "Translated post 42 in 0.5s to en,ru",
+    "Chat -100 has 3 target languages",
+]
+
+
+def format_message(message: str) -> str:
+    formatter = PIISafeFormatter("%(message)s")
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+    return formatter.format(record)
+
+
+@pytest.mark.parametrize("message, expected", REDACTED)
+def test_each_redaction_class_is_masked(message, expected):
+    assert format_message(message) == expected
+
+
+@pytest.mark.parametrize("message", CLEAN)
+def test_clean_messages_are_unchanged(message):
+    assert format_message(message) == message
+
+
+@pytest.mark.parametrize("message", [message for message, _ in REDACTED] + CLEAN)
+def test_prefilter_never_skips_a_redactable_message(message):
+    if PIISafeFormatter.REDACT_RE.search(message):
+        assert PIISafeFormatter.NEEDS_REDACTION_RE.search(message)
@@ -0,0 +1,101 @@
+"""Tests for outgoing Bot API request throttling."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiogram.methods import GetMe, SendMessage
+
+from app.middlewares import request_throttling
+from app.middlewares.request_throttling import OutgoingThrottlingMiddleware, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock; sleeping advances it and records the delay."""
+    state = SimpleNamespace(now=0.0, sleeps=[])
+    
+    async def sleep(delay):
+        state.sleeps.append(delay)
+        state.now += delay
+    
+    monkeypatch.setattr(request_throttling, "time", SimpleNamespace(monotonic=lambda: state.now))
+    monkeypatch.setattr(request_throttling, "asyncio", SimpleNamespace(Lock=asyncio.Lock, sleep=sleep))
+    return state
+
+
+async def make_request(bot, method):
+    return method.__api_method__
+
+
+async def test_bucket_bursts_then_waits_for_refill(clock):
+    bucket = TokenBucket(rate=2, capacity=2)
+    
+    await bucket.acquire()
+    await bucket.acquire()
+    assert clock.sleeps == []
+    
+    await bucket.acquire()
+    assert clock.sleeps == [0.5]
+    
+    # Half a token accrued: only the missing half is waited for
+    clock.now += 0.25
+    await bucket.acquire()
+    assert clock.sleeps == [0.5, 0.25]
+
+
+async def test_bucket_refill_is_capped_and_idle(clock):
+    bucket = TokenBucket(rate=2, capacity=2)
+    await bucket.acquire()
+    assert not bucket.is_idle()
+    
+    clock.now += 60
+    assert bucket.is_idle()
+    assert bucket.tokens == 2
+
+
+async def test_private_chat_allows_one_message_per_second(clock):
+    middleware = OutgoingThrottlingMiddleware()
+    
+    for _ in range(3):
+        await middleware(make_request, None, SendMessage(chat_id=42, text="hi"))
+    assert clock.sleeps == [1.0, 1.0]
+
+
+async def test_group_allows_twenty_messages_per_minute(clock):
+    middleware = OutgoingThrottlingMiddleware()
+    
+    for _ in range(20):
+        await middleware(make_request, None, SendMessage(chat_id=-100123, text="hi"))
+    assert clock.sleeps == []
+    
+    await middleware(make_request, None, SendMessage(chat_id="@channel", text="hi"))
+    assert clock.sleeps == []
+    await middleware(make_request, None, SendMessage(chat_id=-100123, text="hi"))
+    assert clock.sleeps == [pytest.approx(3.0)]
+
+
+async def test_global_limit_applies_to_all_methods(clock):
+    middleware = OutgoingThrottlingMiddleware()
+    
+    for _ in range(30):
+        assert await middleware(make_request, None, GetMe()) == "getMe"
+    assert clock.sleeps == []
+    
+    await middleware(make_request, None, GetMe())
+    assert clock.sleeps == [pytest.approx(1 / 30)]
+    # Methods without a chat never create per-chat buckets
+    assert middleware._chat_buckets == {}
+
+
+async def test_idle_chat_buckets_are_pruned(clock, monkeypatch):
+    monkeypatch.setattr(OutgoingThrottlingMiddleware, "MAX_CHAT_BUCKETS", 3)
+    middleware = OutgoingThrottlingMiddleware()
+    
+    for chat_id in (1, 2, 3):
+        middleware._get_chat_bucket(chat_id)
+    # Chat 1 has just sent a message, so its bucket is not idle
+    await middleware._get_chat_bucket(1).acquire()
+    
+    middleware._get_chat_bucket(4)
+    assert set(middleware._chat_buckets) == {1, 4}